@@ -914,18 +914,10 @@ async def _execute_delete(
         except ValueError:
             amount_str = deleted_tx.get("Сумма", "0")
 
-        from src.services.sheets_async import async_get_transactions
+        from src.services.sheets_async import async_get_current_balance
 
-        last_tx = await async_get_transactions(limit=1)
-        balance_text = ""
-        if last_tx:
-            try:
-                balance = float(
-                    str(last_tx[0].get("Баланс", "0")).replace(" ", "").replace(",", ".")
-                )
-                balance_text = f"\nТекущий баланс: {format_amount(balance)} руб."
-            except ValueError:
-                pass
+        balance = await async_get_current_balance()
+        balance_text = f"\nТекущий баланс: {format_amount(balance)} руб."
 
         text = (
             "Транзакция удалена.\n\n"
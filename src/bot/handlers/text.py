@@ -1,5 +1,6 @@
 import logging
 import re
+from functools import lru_cache
 
 from telegram import Update
 from telegram.ext import ContextTypes
@@ -11,17 +12,57 @@ from src.bot.keyboards import (
     main_menu_keyboard,
 )
 from src.bot.message_manager import REPLY_KEYBOARD_TEXT, delete_user_message, update_main_message
+from src.models.category import EXPENSE_CATEGORIES, INCOME_CATEGORY, TransactionType
 from src.utils.metrics_decorator import track_request
 
 logger = logging.getLogger(__name__)
 
+PART_SEPARATOR_RE = re.compile(r"[,;]\s*|\s+и\s+")
+AMOUNT_PART_PATTERNS = tuple(
+    re.compile(pattern)
+    for pattern in (
+        r"(\d+[\s.]*\d*)\s*(?:т(?:ыс)?(?:яч)?\.?)\s*(?:р|руб|рублей|₽)?",
+        r"(\d+[\s.]*\d*)\s*(?:р|руб|рублей|₽)",
+        r"(?:за|на|потратил|заплатил|получил|доход|оплатил)\s*(\d+[\s.]*\d*)",
+        r"(\d+[\s.]*\d*)",
+    )
+)
+AMOUNT_TEXT_PATTERNS = tuple(
+    re.compile(pattern)
+    for pattern in (
+        r"(\d+)\s*(?:р|руб|рублей|₽)",
+        r"(?:за|на|потратил|заплатил|получил|доход)\s*(\d+)",
+        r"(\d+)",
+    )
+)
+THOUSANDS_MARKERS = ("тыс", "т.", "т ")
+DESCRIPTION_AMOUNT_RE = re.compile(r"\d+\s*(?:р|руб|рублей|₽|тысяч|тыс)?")
+FILLER_WORDS = frozenset({"потратил", "заплатил", "на", "за", "купил"})
+
+INCOME_KEYWORDS = ("зарплата", "получил", "доход", "заработал", "премия", "перевод от")
+
+
+def _keywords_pattern(keywords) -> re.Pattern:
+    """Собирает ключевые слова в одно регулярное выражение для поиска подстроки."""
+    return re.compile("|".join(re.escape(keyword) for keyword in keywords))
+
+
+CATEGORY_MATCHERS = (
+    (_keywords_pattern(INCOME_KEYWORDS), TransactionType.INCOME, INCOME_CATEGORY.name),
+    *(
+        (_keywords_pattern(category.keywords), TransactionType.EXPENSE, category.name)
+        for category in EXPENSE_CATEGORIES
+        if category.keywords
+    ),
+)
+
 
 def parse_multiple_transactions(text: str) -> list[dict]:
     """Парсит несколько транзакций из текста."""
 
-    transactions = []
-
-    parts = re.split(r"[,;]\s*|\s+и\s+", text)
+    parts = PART_SEPARATOR_RE.split(text)
+    transactions = [None] * len(parts)
+    count = 0
 
     for part in parts:
         part = part.strip()
@@ -36,39 +77,31 @@ def parse_multiple_transactions(text: str) -> list[dict]:
         description = clean_description(part)
 
         if description:
-            transactions.append(
-                {
-                    "type": tx_type,
-                    "category": category,
-                    "description": description,
-                    "amount": amount,
-                }
-            )
+            transactions[count] = {
+                "type": tx_type,
+                "category": category,
+                "description": description,
+                "amount": amount,
+            }
+            count += 1
 
-    return transactions
+    return transactions[:count]
 
 
 def parse_amount_from_part(text: str) -> float | None:
     """Извлекает сумму из части текста."""
     text_clean = text.lower().replace("\u00a0", " ")
+    in_thousands = any(marker in text_clean for marker in THOUSANDS_MARKERS)
 
-    patterns = [
-        r"(\d+[\s.]*\d*)\s*(?:т(?:ыс)?(?:яч)?\.?)\s*(?:р|руб|рублей|₽)?",
-        r"(\d+[\s.]*\d*)\s*(?:р|руб|рублей|₽)",
-        r"(?:за|на|потратил|заплатил|получил|доход|оплатил)\s*(\d+[\s.]*\d*)",
-        r"(\d+[\s.]*\d*)",
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, text_clean)
+    for pattern in AMOUNT_PART_PATTERNS:
+        match = pattern.search(text_clean)
         if match:
             try:
                 num_str = match.group(1).replace(" ", "").replace(".", "")
                 amount = float(num_str)
 
-                if "тыс" in text_clean or "т." in text_clean or "т " in text_clean:
-                    if amount < 1000:
-                        amount *= 1000
+                if in_thousands and amount < 1000:
+                    amount *= 1000
 
                 if amount > 0:
                     return amount
@@ -262,19 +295,11 @@ async def show_next_transaction(context: ContextTypes.DEFAULT_TYPE, chat_id: int
 
 def parse_amount(text: str) -> float | None:
     """Извлекает сумму из текста."""
-    import re
-
     text = text.lower().replace(" ", "").replace("\u00a0", "")
     text = text.replace(".", "").replace(",", "")
 
-    patterns = [
-        r"(\d+)\s*(?:р|руб|рублей|₽)",
-        r"(?:за|на|потратил|заплатил|получил|доход)\s*(\d+)",
-        r"(\d+)",
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, text)
+    for pattern in AMOUNT_TEXT_PATTERNS:
+        match = pattern.search(text)
         if match:
             try:
                 return float(match.group(1))
@@ -286,32 +311,26 @@ def parse_amount(text: str) -> float | None:
 
 def determine_type_and_category(text: str) -> tuple:
     """Определяет тип и категорию транзакции по тексту."""
-    from src.models.category import EXPENSE_CATEGORIES, INCOME_CATEGORY, TransactionType
-
-    text_lower = text.lower()
+    return _classify_text(text.lower().strip())
 
-    income_keywords = ["зарплата", "получил", "доход", "заработал", "премия", "перевод от"]
-    if any(kw in text_lower for kw in income_keywords):
-        return TransactionType.INCOME, INCOME_CATEGORY.name
 
-    for category in EXPENSE_CATEGORIES:
-        for keyword in category.keywords:
-            if keyword in text_lower:
-                return TransactionType.EXPENSE, category.name
+@lru_cache(maxsize=4096)
+def _classify_text(normalized: str) -> tuple:
+    """Определяет тип и категорию по нормализованному тексту, запоминая ответ."""
+    for pattern, tx_type, category_name in CATEGORY_MATCHERS:
+        if pattern.search(normalized):
+            return tx_type, category_name
 
     return TransactionType.EXPENSE, "Прочее"
 
 
-def clean_description(text: str) -> str:
-    """Очищает описание от лишних слов."""
-    import re
-
-    text = re.sub(r"\d+\s*(?:р|руб|рублей|₽|тысяч|тыс)?", "", text)
-    text = re.sub(r"\s+", " ", text).strip()
+def clear_category_cache() -> None:
+    """Сбрасывает кэш определения категорий."""
+    _classify_text.cache_clear()
 
-    remove_words = ["потратил", "заплатил", "на", "за", "купил"]
-    words = text.split()
-    words = [w for w in words if w.lower() not in remove_words]
 
-    result = " ".join(words).strip()
-    return result if result else text
+def clean_description(text: str) -> str:
+    """Очищает описание от лишних слов."""
+    words = DESCRIPTION_AMOUNT_RE.sub("", text).split()
+    kept = [w for w in words if w.lower() not in FILLER_WORDS]
+    return " ".join(kept or words)
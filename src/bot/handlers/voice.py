@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from pathlib import Path
 
@@ -41,7 +42,7 @@ async def voice_message_handler(update: Update, context: ContextTypes.DEFAULT_TY
     await file.download_to_drive(ogg_path)
 
     text = await transcribe_audio(ogg_path)
-    ogg_path.unlink(missing_ok=True)
+    await asyncio.to_thread(ogg_path.unlink, missing_ok=True)
 
     if not text:
         await update_main_message(
@@ -114,7 +114,7 @@ def transactions_list_keyboard() -> InlineKeyboardMarkup:
 
 def delete_select_keyboard(transactions: list[dict]) -> InlineKeyboardMarkup:
     """Клавиатура выбора транзакции для удаления."""
-    from datetime import datetime
+    from src.utils.formatters import parse_date
 
     buttons = []
     for tx in transactions:
@@ -125,7 +125,7 @@ def delete_select_keyboard(transactions: list[dict]) -> InlineKeyboardMarkup:
         tx_type = tx.get("Тип", "")
 
         try:
-            date_obj = datetime.strptime(date, "%Y-%m-%d")
+            date_obj = parse_date(date)
             date_str = date_obj.strftime("%d.%m")
         except ValueError:
             date_str = date
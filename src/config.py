@@ -21,6 +21,10 @@ ALLOWED_USER_IDS = [
 
 SOCKS_PROXY = os.getenv("SOCKS_PROXY", "")
 
+SHEETS_THREAD_POOL_SIZE = int(
+    os.getenv("SHEETS_THREAD_POOL_SIZE", min(32, (os.cpu_count() or 2) * 5))
+)
+
 WHISPER_MODEL = "medium"
 
 EXPENSE_CATEGORIES = [
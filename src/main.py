@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import sys
 from pathlib import Path
@@ -137,10 +138,12 @@ async def post_init(app: Application) -> None:
     logger.info("Resource monitoring started")
 
     try:
-        from src.services.sheets_async import async_init_spreadsheet
+        from src.services.sheets_async import async_init_spreadsheet, async_warm_up
 
         await async_init_spreadsheet()
         logger.info("Spreadsheet structure initialized")
+
+        await async_warm_up()
     except Exception as e:
         logger.warning(f"Could not initialize spreadsheet: {e}")
 
@@ -158,12 +161,17 @@ async def post_shutdown(app: Application) -> None:
         await resource_monitor.stop_monitoring()
 
         from src.services.ai_analyzer import close_gpt_session
-        from src.services.sheets_async import shutdown_executor
+        from src.services.sheets import close_sheets_session
+        from src.services.sheets_async import shutdown_executor, stop_write_queue
         from src.services.speech import close_speech_session
+        from src.utils.http import close_shared_connector
 
+        await stop_write_queue()
         await close_speech_session()
         await close_gpt_session()
+        await close_shared_connector()
         shutdown_executor()
+        close_sheets_session()
 
         metrics_summary = metrics.get_metrics_summary()
         logger.info(f"Shutdown complete - Final stats: {metrics_summary['requests']}")
@@ -171,6 +179,18 @@ async def post_shutdown(app: Application) -> None:
         logger.error(f"Error during cleanup: {e}")
 
 
+def install_uvloop() -> None:
+    """Включает uvloop как политику цикла событий, если пакет установлен."""
+    try:
+        import uvloop
+    except ImportError:
+        logger.info("uvloop not installed, using default asyncio event loop")
+        return
+
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    logger.info("uvloop event loop policy installed")
+
+
 def main():
     """Точка входа в приложение."""
     global _application
@@ -179,6 +199,8 @@ def main():
         logger.error("TELEGRAM_BOT_TOKEN not set in .env")
         sys.exit(1)
 
+    install_uvloop()
+
     from src.config import SOCKS_PROXY
 
     builder = (
@@ -6,6 +6,7 @@ import aiohttp
 
 from src.config import YANDEX_GPT_API_KEY, YANDEX_GPT_FOLDER_ID
 from src.models.category import EXPENSE_CATEGORIES, INCOME_CATEGORY, TransactionType
+from src.utils.http import get_shared_connector
 from src.utils.metrics_decorator import track_service_call
 
 logger = logging.getLogger(__name__)
@@ -20,15 +21,11 @@ async def get_gpt_session() -> aiohttp.ClientSession:
     global _gpt_session
     if _gpt_session is None or _gpt_session.closed:
         timeout = aiohttp.ClientTimeout(total=120, connect=30, sock_read=60)
-        connector = aiohttp.TCPConnector(
-            limit=10,
-            limit_per_host=5,
-            ttl_dns_cache=300,
-            force_close=False,
-            enable_cleanup_closed=True,
-        )
         _gpt_session = aiohttp.ClientSession(
-            timeout=timeout, connector=connector, raise_for_status=False
+            timeout=timeout,
+            connector=get_shared_connector(),
+            connector_owner=False,
+            raise_for_status=False,
         )
         logger.info("YandexGPT session created")
     return _gpt_session
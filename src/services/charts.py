@@ -1,10 +1,11 @@
 import logging
-from datetime import datetime
 from io import BytesIO
 
 import matplotlib
 import matplotlib.pyplot as plt
 
+from src.utils.formatters import parse_date
+
 matplotlib.use("Agg")
 
 logger = logging.getLogger(__name__)
@@ -221,7 +222,7 @@ def generate_balance_chart(transactions: list, title: str = "Динамика б
 
     for tx in transactions:
         try:
-            date = datetime.strptime(tx.get("Date", tx.get("date", "")), "%Y-%m-%d")
+            date = parse_date(tx.get("Date", tx.get("date", "")))
             balance = float(tx.get("Balance", tx.get("balance", 0)))
             dates.append(date)
             balances.append(balance)
@@ -550,7 +551,7 @@ def generate_transactions_image(transactions: list[dict]) -> BytesIO:
         tx_type = tx.get("Тип", tx.get("Type", "expense"))
 
         try:
-            date_obj = datetime.strptime(date_raw, "%Y-%m-%d")
+            date_obj = parse_date(date_raw)
             date_str = date_obj.strftime("%d.%m")
         except ValueError:
             date_str = date_raw[:5] if date_raw else ""
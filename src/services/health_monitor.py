@@ -12,6 +12,7 @@ from src.config import (
     YANDEX_GPT_API_KEY,
     YANDEX_GPT_FOLDER_ID,
 )
+from src.utils.http import get_shared_connector
 
 logger = logging.getLogger(__name__)
 
@@ -32,7 +33,9 @@ class HealthMonitor:
 
         try:
             timeout = aiohttp.ClientTimeout(total=10)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
+            async with aiohttp.ClientSession(
+                timeout=timeout, connector=get_shared_connector(), connector_owner=False
+            ) as session:
                 headers = {
                     "Authorization": f"Api-Key {YANDEX_GPT_API_KEY}",
                     "Content-Type": "application/json",
@@ -132,7 +135,9 @@ class HealthMonitor:
 
         try:
             timeout = aiohttp.ClientTimeout(total=10)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
+            async with aiohttp.ClientSession(
+                timeout=timeout, connector=get_shared_connector(), connector_owner=False
+            ) as session:
                 start_time = asyncio.get_event_loop().time()
                 async with session.get(
                     f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/getMe"
@@ -7,11 +7,7 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 
 from src.services.ai_analyzer import generate_monthly_report
-from src.services.sheets import (
-    create_backup,
-    get_enriched_analytics,
-    get_month_summary,
-)
+from src.services.sheets import build_month_report, create_backup
 from src.utils.formatters import month_name
 
 logger = logging.getLogger(__name__)
@@ -37,37 +33,17 @@ async def generate_and_send_monthly_report():
     year = now.year
     month = now.month
 
-    prev_month = month - 1 if month > 1 else 12
-    prev_year = year if month > 1 else year - 1
-
     try:
         loop = asyncio.get_event_loop()
-
-        summary, previous_summary = await asyncio.gather(
-            loop.run_in_executor(None, get_month_summary, year, month),
-            loop.run_in_executor(None, get_month_summary, prev_year, prev_month),
-        )
-
-        start_date = datetime(year, month, 1)
-        if month == 12:
-            end_date = datetime(year + 1, 1, 1)
-        else:
-            end_date = datetime(year, month + 1, 1)
-
-        prev_start = datetime(prev_year, prev_month, 1)
-        prev_end = start_date
-
-        enriched_data = await loop.run_in_executor(
-            None, get_enriched_analytics, start_date, end_date, prev_start, prev_end
-        )
+        data = await loop.run_in_executor(None, build_month_report, year, month)
 
         report = await generate_monthly_report(
-            summary=summary,
-            previous_summary=previous_summary,
+            summary=data["summary"],
+            previous_summary=data["previous_summary"],
             transactions_markdown="",
             month_name=month_name(month),
             year=year,
-            enriched_data=enriched_data,
+            enriched_data=data["enriched"],
         )
 
         await _report_callback(report)
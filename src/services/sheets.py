@@ -1,16 +1,41 @@
+import csv
+import heapq
+import io
 import logging
+import random
+import re
+import threading
 import time
-from datetime import datetime
+from collections import defaultdict
+from datetime import datetime, timedelta
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Optional
 
 import gspread
+import numpy as np
+import pandas as pd
+from google.auth.transport.requests import AuthorizedSession
 from google.oauth2.service_account import Credentials
-
-from src.config import BASE_DIR, GOOGLE_SHEETS_CREDENTIALS_FILE, GOOGLE_SHEETS_SPREADSHEET_ID
+from gspread.utils import DateTimeOption, ValueRenderOption, a1_range_to_grid_range
+from requests.adapters import HTTPAdapter
+
+from src.config import (
+    BASE_DIR,
+    GOOGLE_SHEETS_CREDENTIALS_FILE,
+    GOOGLE_SHEETS_SPREADSHEET_ID,
+    SHEETS_THREAD_POOL_SIZE,
+)
 from src.models.category import TransactionType
 from src.models.transaction import Transaction
 from src.services.metrics import get_metrics
+from src.utils.formatters import parse_date
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
@@ -21,99 +46,365 @@ SCOPES = [
 
 _client: Optional[gspread.Client] = None
 _spreadsheet: Optional[gspread.Spreadsheet] = None
+_connect_lock = threading.RLock()
+_worksheets: dict[str, gspread.Worksheet] = {}
+
+_mirror_rows: Optional[list[list]] = None
+_mirror_loaded_at = 0.0
+_mirror_lock = threading.Lock()
+_append_lock = threading.Lock()
+_next_row: Optional[int] = None
+_values_cache: dict[str, tuple[float, list[list]]] = {}
+_frame_cache: tuple[Optional[list], Optional[pd.DataFrame]] = (None, None)
+_frame_index: tuple[Optional[pd.DataFrame], dict, bool] = (None, {}, False)
+_summary_cache: tuple[Optional[list], dict] = (None, {})
 
 TRANSACTIONS_HEADERS = ["Дата", "Время", "Тип", "Категория", "Описание", "Сумма", "Баланс"]
+FRAME_COLUMNS = ["date", "time", "type", "category", "description", "amount"]
+ISO_DATE_PATTERN = r"\d{4}-\d{2}-\d{2}"
+VECTORIZE_MIN_EXPENSES = 64
+ANOMALY_LIMIT = 5
+
+TRANSACTION_MARKDOWN_TEMPLATE = (
+    "Транзакция {i}:\n"
+    "дата: {date}\n"
+    "тип: {type}\n"
+    "категория: {category}\n"
+    "описание: {description}\n"
+    "сумма: {amount}"
+)
+
+HTTP_POOL_SIZE = SHEETS_THREAD_POOL_SIZE
+
+SHEETS_MAX_RETRIES = 6
+SHEETS_MAX_BACKOFF = 32
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503})
+QUOTA_STATUSES = frozenset({429})
+
+MIRROR_MAX_AGE = 300
+VALUES_CACHE_TTL = 5.0
+
+BORDER_STYLE = {"style": "SOLID", "color": {"red": 0.7, "green": 0.7, "blue": 0.7}}
+CELL_BORDERS = {
+    "top": BORDER_STYLE,
+    "bottom": BORDER_STYLE,
+    "left": BORDER_STYLE,
+    "right": BORDER_STYLE,
+}
+HEADER_TEXT_FORMAT = {
+    "bold": True,
+    "foregroundColor": {"red": 1, "green": 1, "blue": 1},
+    "fontSize": 10,
+}
+TRANSACTIONS_HEADER_FORMAT = {
+    "backgroundColor": {"red": 0.35, "green": 0.45, "blue": 0.55},
+    "textFormat": HEADER_TEXT_FORMAT,
+    "horizontalAlignment": "CENTER",
+    "verticalAlignment": "MIDDLE",
+}
+DARK_HEADER_FORMAT = {
+    "backgroundColor": {"red": 0.35, "green": 0.45, "blue": 0.55},
+    "textFormat": HEADER_TEXT_FORMAT,
+    "borders": CELL_BORDERS,
+}
+LIGHT_HEADER_FORMAT = {
+    "backgroundColor": {"red": 0.93, "green": 0.93, "blue": 0.93},
+    "textFormat": {"bold": True, "fontSize": 10},
+    "borders": CELL_BORDERS,
+}
+GREEN_CELL_FORMAT = {
+    "backgroundColor": {"red": 0.93, "green": 0.97, "blue": 0.93},
+    "borders": CELL_BORDERS,
+}
+WARM_CELL_FORMAT = {
+    "backgroundColor": {"red": 0.97, "green": 0.95, "blue": 0.93},
+    "borders": CELL_BORDERS,
+}
+BLUE_CELL_FORMAT = {
+    "backgroundColor": {"red": 0.93, "green": 0.95, "blue": 0.97},
+    "borders": CELL_BORDERS,
+}
+NORMAL_CELL_FORMAT = {
+    "backgroundColor": {"red": 1, "green": 1, "blue": 1},
+    "borders": CELL_BORDERS,
+}
+TOTAL_ROW_FORMAT = {
+    "backgroundColor": {"red": 0.95, "green": 0.95, "blue": 0.95},
+    "textFormat": {"bold": True},
+    "borders": CELL_BORDERS,
+}
+NUMBER_FORMAT = {"numberFormat": {"type": "NUMBER", "pattern": "#,##0"}}
 
 
 def get_client() -> gspread.Client:
     """Возвращает авторизованный клиент Google Sheets."""
     global _client
-    if _client is None:
-        creds_path = Path(GOOGLE_SHEETS_CREDENTIALS_FILE)
-        if not creds_path.is_absolute():
-            creds_path = BASE_DIR / creds_path
+    if _client is not None:
+        return _client
 
-        if not creds_path.exists():
-            raise FileNotFoundError(f"Credentials file not found: {creds_path}")
+    with _connect_lock:
+        if _client is None:
+            creds_path = Path(GOOGLE_SHEETS_CREDENTIALS_FILE)
+            if not creds_path.is_absolute():
+                creds_path = BASE_DIR / creds_path
 
-        credentials = Credentials.from_service_account_file(str(creds_path), scopes=SCOPES)
-        _client = gspread.authorize(credentials)
-        logger.info("Google Sheets client authorized")
+            if not creds_path.exists():
+                raise FileNotFoundError(f"Credentials file not found: {creds_path}")
+
+            credentials = Credentials.from_service_account_file(str(creds_path), scopes=SCOPES)
+            _client = gspread.Client(auth=credentials, session=_create_session(credentials))
+            logger.info("Google Sheets client authorized")
 
     return _client
 
 
+def _create_session(credentials: Credentials) -> AuthorizedSession:
+    """Создаёт сессию с пулом соединений на все потоки executor-а, чтобы не делать TLS заново."""
+    session = AuthorizedSession(credentials)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE)
+    session.mount("https://", adapter)
+    if orjson is not None:
+        session.hooks["response"].append(_decode_json_with_orjson)
+    return session
+
+
+def _decode_json_with_orjson(response, *args, **kwargs):
+    """Подменяет response.json() на orjson.loads прямо по байтам тела ответа."""
+    response.json = lambda **_: orjson.loads(response.content)
+    return response
+
+
 def get_spreadsheet() -> gspread.Spreadsheet:
     """Возвращает объект таблицы."""
     global _spreadsheet
-    if _spreadsheet is None:
-        if not GOOGLE_SHEETS_SPREADSHEET_ID:
-            raise ValueError("GOOGLE_SHEETS_SPREADSHEET_ID not set")
+    if _spreadsheet is not None:
+        return _spreadsheet
+
+    with _connect_lock:
+        if _spreadsheet is None:
+            if not GOOGLE_SHEETS_SPREADSHEET_ID:
+                raise ValueError("GOOGLE_SHEETS_SPREADSHEET_ID not set")
 
-        client = get_client()
-        _spreadsheet = client.open_by_key(GOOGLE_SHEETS_SPREADSHEET_ID)
-        logger.info(f"Opened spreadsheet: {_spreadsheet.title}")
+            client = get_client()
+            _spreadsheet = client.open_by_key(GOOGLE_SHEETS_SPREADSHEET_ID)
+            logger.info(f"Opened spreadsheet: {_spreadsheet.title}")
 
     return _spreadsheet
 
 
+def close_sheets_session() -> None:
+    """Закрывает пул соединений клиента и сбрасывает клиент, таблицу и кэш листов."""
+    global _client, _spreadsheet
+
+    with _connect_lock:
+        http_client = getattr(_client, "http_client", None)
+        if http_client is not None:
+            http_client.session.close()
+        _client = None
+        _spreadsheet = None
+        _worksheets.clear()
+
+
+def _get_worksheet(name: str) -> gspread.Worksheet:
+    """Возвращает лист по имени, запоминая объект, чтобы не запрашивать метаданные повторно."""
+    worksheet = _worksheets.get(name)
+    if worksheet is None:
+        worksheet = get_spreadsheet().worksheet(name)
+        _worksheets[name] = worksheet
+    return worksheet
+
+
+def _with_retry(
+    func: Callable[..., Any], *args, retry_statuses: frozenset = RETRYABLE_STATUSES, **kwargs
+) -> Any:
+    """Вызывает gspread с экспоненциальной задержкой при превышении квоты и сбоях API."""
+    for attempt in range(SHEETS_MAX_RETRIES):
+        try:
+            return func(*args, **kwargs)
+        except gspread.exceptions.APIError as e:
+            status = e.response.status_code
+            if status not in retry_statuses or attempt == SHEETS_MAX_RETRIES - 1:
+                raise
+            delay = min(2**attempt, SHEETS_MAX_BACKOFF) + random.random()
+            logger.warning(f"Google Sheets API {status}, повтор через {delay:.1f}с")
+            time.sleep(delay)
+
+
+def _get_data_rows(worksheet: gspread.Worksheet, last_col: str = "F") -> list[list]:
+    """Читает строки данных без заголовка до указанной колонки, числа — без форматирования."""
+    return _with_retry(
+        worksheet.get,
+        f"A2:{last_col}",
+        value_render_option=ValueRenderOption.unformatted,
+        date_time_render_option=DateTimeOption.formatted_string,
+    )
+
+
+def _fetch_transaction_rows() -> list[list]:
+    """Возвращает строки A:G листа Транзакции из локального зеркала, перечитывая устаревшее."""
+    global _mirror_rows, _mirror_loaded_at
+
+    with _mirror_lock:
+        if _mirror_rows is None or time.monotonic() - _mirror_loaded_at > MIRROR_MAX_AGE:
+            worksheet = _get_worksheet("Транзакции")
+            _mirror_rows = _get_data_rows(worksheet, "G")
+            _mirror_loaded_at = time.monotonic()
+        return _mirror_rows
+
+
+def _seed_mirror(rows: list[list]) -> None:
+    """Кладёт в зеркало уже прочитанные строки A2:G, избавляя от отдельного чтения."""
+    global _mirror_rows, _mirror_loaded_at
+
+    with _mirror_lock:
+        _mirror_rows = rows
+        _mirror_loaded_at = time.monotonic()
+
+
+def _peek_mirror() -> Optional[list[list]]:
+    """Возвращает зеркало транзакций, только если оно уже загружено и не устарело."""
+    with _mirror_lock:
+        if _mirror_rows is None or time.monotonic() - _mirror_loaded_at > MIRROR_MAX_AGE:
+            return None
+        return _mirror_rows
+
+
+def _append_to_mirror(rows: list[list]) -> None:
+    """Дописывает пачку транзакций в зеркало одной копией, досчитывая баланс; без опорного сбрасывает."""
+    global _mirror_rows
+
+    with _mirror_lock:
+        if _mirror_rows is None:
+            return
+
+        balance = next(
+            (
+                r[6]
+                for r in reversed(_mirror_rows)
+                if len(r) >= 7 and isinstance(r[6], (int, float))
+            ),
+            None,
+        )
+        if balance is None:
+            _mirror_rows = None
+            return
+
+        appended = []
+        for row in rows:
+            amount = row[5]
+            balance = balance + amount if row[2] == "доход" else balance - amount
+            appended.append(row[:6] + [balance])
+        _mirror_rows = _mirror_rows + appended
+
+
+def _cached_values(worksheet: gspread.Worksheet) -> list[list]:
+    """Возвращает get_all_values листа, переиспользуя ответ в пределах VALUES_CACHE_TTL."""
+    now = time.monotonic()
+    hit = _values_cache.get(worksheet.title)
+    if hit and now - hit[0] < VALUES_CACHE_TTL:
+        return hit[1]
+
+    values = _with_retry(worksheet.get_all_values)
+    _values_cache[worksheet.title] = (now, values)
+    return values
+
+
+def _invalidate_transactions() -> None:
+    """Сбрасывает зеркало и кэш значений листа Транзакции, следующее чтение пойдёт в API."""
+    global _mirror_rows, _next_row, _summary_cache
+
+    with _mirror_lock:
+        _mirror_rows = None
+    _values_cache.pop("Транзакции", None)
+    _next_row = None
+    _summary_cache = (None, {})
+
+
+def _is_number(value) -> bool:
+    """Проверяет, что неформатированное значение ячейки — число, а не текст или пустота."""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
 def init_spreadsheet():
     """Инициализирует структуру таблицы: Транзакции + Сводка."""
     spreadsheet = get_spreadsheet()
+    transactions = _get_or_create_sheet(spreadsheet, "Транзакции", rows=10000, cols=7)
+    summary = _get_or_create_sheet(spreadsheet, "Сводка", rows=30, cols=4)
+
+    transactions_values, summary_values = _batch_get_values(
+        spreadsheet, ["Транзакции!A:G", "Сводка!A:D"]
+    )
 
-    _init_transactions_sheet(spreadsheet)
-    _init_summary_sheet(spreadsheet)
+    _init_transactions_sheet(spreadsheet, transactions, transactions_values)
+    _init_summary_sheet(spreadsheet, summary, summary_values)
+    _seed_mirror(transactions_values[1:])
 
     logger.info("Spreadsheet initialized")
 
 
+def _batch_get_values(spreadsheet: gspread.Spreadsheet, ranges: list[str]) -> list[list[list]]:
+    """Читает несколько диапазонов одним batchGet, числа — без форматирования."""
+    response = _with_retry(
+        spreadsheet.values_batch_get,
+        ranges,
+        params={
+            "valueRenderOption": ValueRenderOption.unformatted,
+            "dateTimeRenderOption": DateTimeOption.formatted_string,
+        },
+    )
+    return [value_range.get("values", []) for value_range in response.get("valueRanges", [])]
+
+
+def warm_up():
+    """Заранее загружает зеркало транзакций, чтобы первый запрос не ждал API."""
+    rows = _fetch_transaction_rows()
+    logger.info(f"Transactions mirror loaded: {len(rows)} rows")
+
+
 def _get_or_create_sheet(
     spreadsheet: gspread.Spreadsheet, name: str, rows: int = 1000, cols: int = 20
 ) -> gspread.Worksheet:
     """Получает или создаёт лист."""
     try:
-        return spreadsheet.worksheet(name)
+        worksheet = spreadsheet.worksheet(name)
     except gspread.WorksheetNotFound:
-        return spreadsheet.add_worksheet(title=name, rows=rows, cols=cols)
+        worksheet = spreadsheet.add_worksheet(title=name, rows=rows, cols=cols)
+    _worksheets[name] = worksheet
+    return worksheet
 
 
-def _init_transactions_sheet(spreadsheet: gspread.Spreadsheet):
+def _init_transactions_sheet(
+    spreadsheet: gspread.Spreadsheet, sheet: gspread.Worksheet, existing: list[list]
+):
     """Инициализирует лист Транзакции."""
-    sheet = _get_or_create_sheet(spreadsheet, "Транзакции", rows=10000, cols=7)
-
-    existing = sheet.get_all_values()
     if len(existing) == 0:
-        sheet.update(
-            values=[TRANSACTIONS_HEADERS], range_name="A1:G1", value_input_option="USER_ENTERED"
+        _with_retry(
+            sheet.update,
+            values=[TRANSACTIONS_HEADERS],
+            range_name="A1:G1",
+            value_input_option="USER_ENTERED",
         )
 
-        sheet.format(
-            "A1:G1",
+        requests = [
+            _format_request(sheet, "A1:G1", TRANSACTIONS_HEADER_FORMAT),
+            {"setBasicFilter": {"filter": {"range": {"sheetId": sheet.id}}}},
             {
-                "backgroundColor": {"red": 0.35, "green": 0.45, "blue": 0.55},
-                "textFormat": {
-                    "bold": True,
-                    "foregroundColor": {"red": 1, "green": 1, "blue": 1},
-                    "fontSize": 10,
-                },
-                "horizontalAlignment": "CENTER",
-                "verticalAlignment": "MIDDLE",
+                "updateSheetProperties": {
+                    "properties": {"sheetId": sheet.id, "gridProperties": {"frozenRowCount": 1}},
+                    "fields": "gridProperties/frozenRowCount",
+                }
             },
-        )
-
-        sheet.set_basic_filter()
-        sheet.freeze(rows=1)
-
-        sheet.columns_auto_resize(0, 7)
+            _auto_resize_request(sheet, 0, 7),
+        ]
+        _with_retry(spreadsheet.batch_update, {"requests": requests})
 
         logger.info("Лист Транзакции создан")
 
 
-def _init_summary_sheet(spreadsheet: gspread.Spreadsheet):
+def _init_summary_sheet(
+    spreadsheet: gspread.Spreadsheet, sheet: gspread.Worksheet, existing: list[list]
+):
     """Инициализирует лист Сводка с формулами."""
-    sheet = _get_or_create_sheet(spreadsheet, "Сводка", rows=30, cols=4)
-
-    existing = sheet.get_all_values()
     if len(existing) <= 1:
         categories = [
             "Еда",
@@ -164,131 +455,131 @@ def _init_summary_sheet(spreadsheet: gspread.Spreadsheet):
         summary_data.append(["", ""])
         summary_data.append(["ИТОГО расходы", f"=SUM(B13:B{row_num - 1})"])
 
-        sheet.update(
+        _with_retry(
+            sheet.update,
             values=summary_data,
             range_name=f"A1:B{len(summary_data)}",
             value_input_option="USER_ENTERED",
         )
 
-        dark_header = {
-            "backgroundColor": {"red": 0.35, "green": 0.45, "blue": 0.55},
-            "textFormat": {
-                "bold": True,
-                "foregroundColor": {"red": 1, "green": 1, "blue": 1},
-                "fontSize": 10,
-            },
-            "borders": _get_borders(),
-        }
+        requests = [
+            _format_request(sheet, "A1:B1", DARK_HEADER_FORMAT),
+            _format_request(sheet, "A2:B2", NORMAL_CELL_FORMAT),
+            _format_request(sheet, "A4:B4", DARK_HEADER_FORMAT),
+            _format_request(sheet, "A5:B5", BLUE_CELL_FORMAT),
+            _format_request(sheet, "A7:B7", DARK_HEADER_FORMAT),
+            _format_request(sheet, "A8:B8", GREEN_CELL_FORMAT),
+            _format_request(sheet, "A9:B9", WARM_CELL_FORMAT),
+            _format_request(sheet, "A10:B10", BLUE_CELL_FORMAT),
+            _format_request(sheet, "A12:B12", LIGHT_HEADER_FORMAT),
+            _format_request(sheet, f"A13:B{row_num - 1}", NORMAL_CELL_FORMAT),
+            _format_request(sheet, f"A{row_num + 1}:B{row_num + 1}", TOTAL_ROW_FORMAT),
+            _format_request(sheet, "B2:B30", NUMBER_FORMAT),
+            _auto_resize_request(sheet, 0, 2),
+        ]
+        _with_retry(spreadsheet.batch_update, {"requests": requests})
 
-        light_header = {
-            "backgroundColor": {"red": 0.93, "green": 0.93, "blue": 0.93},
-            "textFormat": {"bold": True, "fontSize": 10},
-            "borders": _get_borders(),
-        }
+        logger.info("Лист Сводка создан")
 
-        green_cell = {
-            "backgroundColor": {"red": 0.93, "green": 0.97, "blue": 0.93},
-            "borders": _get_borders(),
-        }
 
-        warm_cell = {
-            "backgroundColor": {"red": 0.97, "green": 0.95, "blue": 0.93},
-            "borders": _get_borders(),
+def _format_request(sheet: gspread.Worksheet, a1_range: str, cell_format: dict) -> dict:
+    """Собирает repeatCell-запрос для batch_update — то же, что делает Worksheet.format."""
+    return {
+        "repeatCell": {
+            "range": a1_range_to_grid_range(a1_range, sheet.id),
+            "cell": {"userEnteredFormat": cell_format},
+            "fields": f"userEnteredFormat({','.join(cell_format)})",
         }
+    }
 
-        blue_cell = {
-            "backgroundColor": {"red": 0.93, "green": 0.95, "blue": 0.97},
-            "borders": _get_borders(),
-        }
 
-        normal_cell = {
-            "backgroundColor": {"red": 1, "green": 1, "blue": 1},
-            "borders": _get_borders(),
+def _auto_resize_request(sheet: gspread.Worksheet, start: int, end: int) -> dict:
+    """Собирает запрос автоподбора ширины колонок [start, end)."""
+    return {
+        "autoResizeDimensions": {
+            "dimensions": {
+                "sheetId": sheet.id,
+                "dimension": "COLUMNS",
+                "startIndex": start,
+                "endIndex": end,
+            }
         }
+    }
 
-        sheet.format("A1:B1", dark_header)
-        sheet.format("A2:B2", normal_cell)
-
-        sheet.format("A4:B4", dark_header)
-        sheet.format("A5:B5", blue_cell)
-
-        sheet.format("A7:B7", dark_header)
-        sheet.format("A8:B8", green_cell)
-        sheet.format("A9:B9", warm_cell)
-        sheet.format("A10:B10", blue_cell)
-
-        sheet.format("A12:B12", light_header)
-
-        for i in range(13, row_num):
-            sheet.format(f"A{i}:B{i}", normal_cell)
-
-        sheet.format(
-            f"A{row_num + 1}:B{row_num + 1}",
-            {
-                "backgroundColor": {"red": 0.95, "green": 0.95, "blue": 0.95},
-                "textFormat": {"bold": True},
-                "borders": _get_borders(),
-            },
-        )
-
-        sheet.format("B2:B30", {"numberFormat": {"type": "NUMBER", "pattern": "#,##0"}})
-
-        sheet.columns_auto_resize(0, 2)
-
-        logger.info("Лист Сводка создан")
 
+def add_transaction(transaction: Transaction) -> int:
+    return add_transactions([transaction])[0]
 
-def _get_borders():
-    """Возвращает стиль границ для ячеек."""
-    border_style = {"style": "SOLID", "color": {"red": 0.7, "green": 0.7, "blue": 0.7}}
-    return {
-        "top": border_style,
-        "bottom": border_style,
-        "left": border_style,
-        "right": border_style,
-    }
 
+def add_transactions(transactions: list[Transaction]) -> list[int]:
+    """Дописывает транзакции в конец листа одним запросом и возвращает их номера."""
+    global _next_row
 
-def add_transaction(transaction: Transaction) -> int:
     start_time = time.time()
     success = False
     error_msg = None
 
     try:
-        spreadsheet = get_spreadsheet()
-        worksheet = spreadsheet.worksheet("Транзакции")
+        worksheet = _get_worksheet("Транзакции")
+
+        with _append_lock:
+            if _next_row is None:
+                _next_row = len(_cached_values(worksheet)) + 1
+            first_row = _next_row
+
+            now = datetime.now()
+            date_str = now.strftime("%Y-%m-%d")
+            time_str = now.strftime("%H:%M")
+
+            rows = []
+            for row_num, transaction in enumerate(transactions, first_row):
+                tx_type = "доход" if transaction.type == TransactionType.INCOME else "расход"
+                rows.append(
+                    [
+                        date_str,
+                        time_str,
+                        tx_type,
+                        transaction.category,
+                        transaction.description,
+                        transaction.amount,
+                        _balance_formula(row_num),
+                    ]
+                )
 
-        all_values = worksheet.get_all_values()
-        row_num = len(all_values) + 1
+            response = _with_retry(
+                worksheet.append_rows,
+                rows,
+                value_input_option="USER_ENTERED",
+                table_range="A1",
+                retry_statuses=QUOTA_STATUSES,
+            )
+            _values_cache.pop("Транзакции", None)
 
-        now = datetime.now()
-        date_str = now.strftime("%Y-%m-%d")
-        time_str = now.strftime("%H:%M")
-
-        tx_type = "доход" if transaction.type == TransactionType.INCOME else "расход"
-
-        if row_num == 2:
-            balance_formula = f'=Сводка!$B$2 + IF(C{row_num}="доход"; F{row_num}; -F{row_num})'
-        else:
-            balance_formula = f'=IF(F{row_num}=""; ""; G{row_num - 1} + IF(C{row_num}="доход"; F{row_num}; -F{row_num}))'
-
-        row = [
-            date_str,
-            time_str,
-            tx_type,
-            transaction.category,
-            transaction.description,
-            transaction.amount,
-            balance_formula,
-        ]
+            actual_row = _appended_first_row(response)
+            if actual_row is not None and actual_row != first_row:
+                logger.warning(
+                    f"Строки легли с {actual_row} вместо {first_row}, пересчитываю формулы баланса"
+                )
+                first_row = actual_row
+                _with_retry(
+                    worksheet.update,
+                    values=[[_balance_formula(first_row + i)] for i in range(len(rows))],
+                    range_name=f"G{first_row}:G{first_row + len(rows) - 1}",
+                    value_input_option="USER_ENTERED",
+                )
+                _invalidate_transactions()
 
-        worksheet.append_row(row, value_input_option="USER_ENTERED")
+            _next_row = first_row + len(rows)
+            _append_to_mirror(rows)
 
-        transaction.tx_id = row_num - 1
+            tx_ids = []
+            for row_num, transaction in enumerate(transactions, first_row):
+                transaction.tx_id = row_num - 1
+                tx_ids.append(transaction.tx_id)
+                logger.info(f"Транзакция #{transaction.tx_id}: {transaction.description}")
 
-        logger.info(f"Транзакция #{transaction.tx_id}: {transaction.description}")
         success = True
-        return transaction.tx_id
+        return tx_ids
 
     except Exception as e:
         error_msg = str(e)
@@ -299,29 +590,39 @@ def add_transaction(transaction: Transaction) -> int:
         get_metrics().record_service_call("google_sheets", success, duration, error_msg)
 
 
-def get_last_balance() -> float:
-    """Возвращает последний баланс из транзакций."""
+def _balance_formula(row_num: int) -> str:
+    """Формула баланса строки: предыдущий баланс (или начальный для первой) ± сумма."""
+    if row_num == 2:
+        return f'=Сводка!$B$2 + IF(C{row_num}="доход"; F{row_num}; -F{row_num})'
+    return (
+        f'=IF(F{row_num}=""; ""; G{row_num - 1} + IF(C{row_num}="доход"; F{row_num}; -F{row_num}))'
+    )
+
+
+def _appended_first_row(response) -> Optional[int]:
+    """Достаёт номер первой дописанной строки из ответа values.append."""
+    if not isinstance(response, dict):
+        return None
+    updated_range = response.get("updates", {}).get("updatedRange", "")
+    match = re.search(r"![A-Z]+(\d+)", updated_range)
+    return int(match.group(1)) if match else None
+
+
+def get_last_balance(rows: list[list] | None = None) -> float:
+    """Возвращает последний баланс: из снимка транзакций, если он есть, иначе из Сводка!B5."""
     try:
-        spreadsheet = get_spreadsheet()
-        worksheet = spreadsheet.worksheet("Транзакции")
-
-        all_values = worksheet.get_all_values()
-        if len(all_values) <= 1:
-            summary = spreadsheet.worksheet("Сводка")
-            value = summary.acell("B5").value
-            return float(value.replace(" ", "").replace(",", ".")) if value else 0
-
-        for row in reversed(all_values[1:]):
-            if len(row) >= 7 and row[6] and row[6].strip():
-                try:
-                    balance = float(row[6].replace(" ", "").replace(",", "."))
-                    return balance
-                except ValueError:
-                    continue
-
-        summary = spreadsheet.worksheet("Сводка")
-        value = summary.acell("B5").value
-        return float(value.replace(" ", "").replace(",", ".")) if value else 0
+        if rows is None:
+            rows = _peek_mirror()
+
+        for row in reversed(rows or []):
+            if len(row) >= 7 and _is_number(row[6]):
+                return float(row[6])
+
+        summary = _get_worksheet("Сводка")
+        value = _with_retry(
+            summary.acell, "B5", value_render_option=ValueRenderOption.unformatted
+        ).value
+        return float(value) if _is_number(value) else 0
 
     except Exception as e:
         logger.error(f"Ошибка получения баланса: {e}")
@@ -335,178 +636,212 @@ def get_current_balance() -> float:
 
 def get_transactions(limit: int = 10, offset: int = 0) -> list[dict]:
     """Возвращает список последних транзакций."""
-    spreadsheet = get_spreadsheet()
-    worksheet = spreadsheet.worksheet("Транзакции")
+    worksheet = _get_worksheet("Транзакции")
 
-    all_values = worksheet.get_all_values()
+    all_values = _cached_values(worksheet)
     if len(all_values) <= 1:
         return []
 
     headers = all_values[0]
-    data = all_values[1:]
-
-    data.reverse()
-
-    result = []
-    for row in data[offset : offset + limit]:
-        tx = dict(zip(headers, row))
-        result.append(tx)
+    end = len(all_values) - offset
+    start = max(1, end - limit)
+    if end <= start:
+        return []
 
-    return result
+    return [dict(zip(headers, row)) for row in reversed(all_values[start:end])]
 
 
-def get_month_summary(year: int, month: int) -> dict:
+def get_month_summary(year: int, month: int, rows: list[list] | None = None) -> dict:
     """Возвращает сводку за месяц."""
-    return calculate_month_summary(year, month)
+    return calculate_month_summary(year, month, rows)
 
 
-def calculate_month_summary(year: int, month: int) -> dict:
+def calculate_month_summary(year: int, month: int, rows: list[list] | None = None) -> dict:
     """Вычисляет сводку за месяц из транзакций."""
-    spreadsheet = get_spreadsheet()
-    worksheet = spreadsheet.worksheet("Транзакции")
-
-    all_values = worksheet.get_all_values()
-    if len(all_values) <= 1:
+    if rows is None:
+        rows = _fetch_transaction_rows()
+    if not rows:
         return {"income": 0, "expenses": 0, "balance": 0, "by_category": {}}
 
-    income = 0
-    expenses = 0
-    by_category = {}
+    month_key = f"{year}-{month:02d}"
+    summary = _cached_summary(
+        rows, ("month", month_key), lambda: _summarize_frame(_get_month_frame(rows, month_key))
+    )
+    return {**summary, "by_category": dict(summary["by_category"])}
 
-    month_str = f"{year}-{month:02d}"
 
-    for row in all_values[1:]:
-        try:
-            date_str = row[0] if row[0] else ""
-            if not date_str.startswith(month_str):
-                continue
+def get_period_summary(
+    start_date: datetime, end_date: datetime, rows: list[list] | None = None
+) -> dict:
+    """Возвращает сводку за произвольный период."""
+    if rows is None:
+        rows = _fetch_transaction_rows()
+    if not rows:
+        return {"income": 0, "expenses": 0, "balance": 0, "by_category": {}, "transactions": []}
 
-            amount = float(row[5]) if len(row) > 5 and row[5] else 0
-            tx_type = row[2] if len(row) > 2 else ""
-            category = row[3] if len(row) > 3 else ""
+    start_str, end_str = _period_bounds(start_date, end_date)
+    summary = _cached_summary(
+        rows, ("period", start_str, end_str), lambda: _summarize_period(rows, start_str, end_str)
+    )
+    return {
+        **summary,
+        "by_category": dict(summary["by_category"]),
+        "transactions": list(summary["transactions"]),
+    }
 
-            if tx_type == "доход":
-                income += amount
-            else:
-                expenses += amount
-                by_category[category] = by_category.get(category, 0) + amount
 
-        except (ValueError, IndexError):
-            continue
+def _summarize_period(rows: list[list], start_str: str, end_str: str) -> dict:
+    """Считает сводку за период вместе со списком его транзакций."""
+    period_frame = _get_period_frame(rows, start_str, end_str)
 
-    return {
-        "income": income,
-        "expenses": expenses,
-        "balance": income - expenses,
-        "by_category": by_category,
-    }
+    summary = _summarize_frame(period_frame)
+    summary["transactions"] = period_frame[
+        ["date", "type", "category", "description", "amount"]
+    ].to_dict("records")
+    return summary
 
 
-def get_period_summary(start_date: datetime, end_date: datetime) -> dict:
-    """Возвращает сводку за произвольный период."""
-    spreadsheet = get_spreadsheet()
-    worksheet = spreadsheet.worksheet("Транзакции")
+def _cached_summary(rows: list[list], key: tuple, compute: Callable[[], dict]) -> dict:
+    """Возвращает сводку для снимка строк, считая её один раз на снимок и ключ."""
+    global _summary_cache
 
-    all_values = worksheet.get_all_values()
-    if len(all_values) <= 1:
-        return {"income": 0, "expenses": 0, "balance": 0, "by_category": {}, "transactions": []}
+    cached_rows, summaries = _summary_cache
+    if cached_rows is not rows:
+        summaries = {}
+        _summary_cache = (rows, summaries)
 
-    income = 0
-    expenses = 0
-    by_category = {}
-    transactions = []
+    summary = summaries.get(key)
+    if summary is None:
+        summary = summaries[key] = compute()
+    return summary
 
-    for row in all_values[1:]:
-        try:
-            date_str = row[0] if row[0] else ""
-            if not date_str:
-                continue
 
-            tx_date = datetime.strptime(date_str, "%Y-%m-%d")
+def _build_frame(rows: list[list]) -> pd.DataFrame:
+    """Собирает DataFrame из строк листа, отбрасывая строки с битой датой или суммой."""
+    frame = pd.DataFrame(rows).iloc[:, : len(FRAME_COLUMNS)]
+    frame.columns = FRAME_COLUMNS[: frame.shape[1]]
+    frame = frame.reindex(columns=FRAME_COLUMNS).fillna("")
 
-            if tx_date < start_date or tx_date > end_date:
-                continue
+    frame["amount"] = pd.to_numeric(frame["amount"].replace("", 0), errors="coerce")
+    frame["date"] = frame["date"].astype(str)
+    valid_date = frame["date"].str.fullmatch(ISO_DATE_PATTERN)
 
-            amount = float(row[5]) if len(row) > 5 and row[5] else 0
-            tx_type = row[2] if len(row) > 2 else ""
-            category = row[3] if len(row) > 3 else ""
-            description = row[4] if len(row) > 4 else ""
+    frame = frame[frame["amount"].notna() & valid_date]
+    return frame.assign(
+        month=frame["date"].str[:7],
+        type=frame["type"].astype("category"),
+        category=frame["category"].astype(str).astype("category"),
+        description=frame["description"].astype(str),
+    )
 
-            if tx_type == "доход":
-                income += amount
-            else:
-                expenses += amount
-                by_category[category] = by_category.get(category, 0) + amount
 
-            transactions.append(
-                {
-                    "date": date_str,
-                    "type": tx_type,
-                    "category": category,
-                    "description": description,
-                    "amount": amount,
-                }
-            )
+def _get_frame(rows: list[list]) -> pd.DataFrame:
+    """Возвращает DataFrame для снимка строк, собирая его один раз на каждый снимок."""
+    global _frame_cache
 
-        except (ValueError, IndexError):
-            continue
+    cached_rows, frame = _frame_cache
+    if cached_rows is not rows:
+        frame = _build_frame(rows)
+        _frame_cache = (rows, frame)
+    return frame
+
+
+def _get_frame_index(frame: pd.DataFrame) -> tuple[dict, bool]:
+    """Возвращает позиции строк по месяцам и признак сортировки дат, один раз на снимок."""
+    global _frame_index
+
+    indexed_frame, month_positions, dates_sorted = _frame_index
+    if indexed_frame is not frame:
+        month_positions = frame.groupby("month", sort=False).indices
+        dates_sorted = frame["date"].is_monotonic_increasing
+        _frame_index = (frame, month_positions, dates_sorted)
+    return month_positions, dates_sorted
+
+
+def _get_month_frame(rows: list[list], month_key: str) -> pd.DataFrame:
+    """Возвращает транзакции месяца по индексу позиций вместо маски по всему снимку."""
+    frame = _get_frame(rows)
+    positions = _get_frame_index(frame)[0].get(month_key)
+    if positions is None:
+        return frame.iloc[:0]
+    return frame.iloc[positions]
+
+
+def _get_period_frame(rows: list[list], start_str: str, end_str: str) -> pd.DataFrame:
+    """Возвращает транзакции периода: бинарным поиском по отсортированным датам, иначе маской."""
+    frame = _get_frame(rows)
+    dates = frame["date"]
+    if not _get_frame_index(frame)[1]:
+        return frame[(dates >= start_str) & (dates <= end_str)]
+
+    lo = dates.searchsorted(start_str, side="left")
+    hi = dates.searchsorted(end_str, side="right")
+    return frame.iloc[lo:hi]
+
+
+def _period_bounds(start_date: datetime, end_date: datetime) -> tuple[str, str]:
+    """Переводит границы периода в ISO-строки, сравнимые с датами листа лексикографически."""
+    start_day = start_date.date()
+    if start_date.time() != datetime.min.time():
+        start_day += timedelta(days=1)
+    return start_day.isoformat(), end_date.date().isoformat()
+
+
+def _summarize_frame(frame: pd.DataFrame) -> dict:
+    """Считает доходы, расходы и расходы по категориям для набора транзакций."""
+    is_income = frame["type"] == "доход"
+    income = float(frame.loc[is_income, "amount"].sum())
+    expenses_frame = frame[~is_income]
+    expenses = float(expenses_frame["amount"].sum())
+
+    by_category = expenses_frame.groupby("category", sort=False, observed=True)["amount"].sum()
 
     return {
         "income": income,
         "expenses": expenses,
         "balance": income - expenses,
-        "by_category": by_category,
-        "transactions": transactions,
+        "by_category": {category: float(amount) for category, amount in by_category.items()},
     }
 
 
-def get_month_transactions_markdown(year: int, month: int, limit: int = 100) -> str:
+def get_month_transactions_markdown(
+    year: int, month: int, limit: int = 100, rows: list[list] | None = None
+) -> str:
     """Возвращает транзакции за месяц в Markdown-KV формате для AI."""
-    spreadsheet = get_spreadsheet()
-    worksheet = spreadsheet.worksheet("Транзакции")
-
-    all_values = worksheet.get_all_values()
-    if len(all_values) <= 1:
+    if rows is None:
+        rows = _fetch_transaction_rows()
+    if not rows:
         return "Нет транзакций"
 
     transactions = []
     month_str = f"{year}-{month:02d}"
 
-    for row in all_values[1:]:
-        try:
-            date_str = row[0] if row[0] else ""
-            if not date_str.startswith(month_str):
-                continue
+    for row in rows:
+        if not row or not str(row[0]).startswith(month_str):
+            continue
 
-            transactions.append(
-                {
-                    "date": row[0],
-                    "type": row[2],
-                    "category": row[3],
-                    "description": row[4],
-                    "amount": row[5],
-                }
-            )
+        try:
+            date_str, _, tx_type, category, description, amount, *_ = row
+        except ValueError:
+            continue
 
-            if len(transactions) >= limit:
-                break
+        transactions.append(
+            {
+                "date": date_str,
+                "type": tx_type,
+                "category": category,
+                "description": description,
+                "amount": amount,
+            }
+        )
 
-        except (ValueError, IndexError):
-            continue
+        if len(transactions) >= limit:
+            break
 
     if not transactions:
         return "Нет транзакций за этот период"
 
-    result = []
-    for i, tx in enumerate(transactions, 1):
-        result.append(f"""Транзакция {i}:
-дата: {tx["date"]}
-тип: {tx["type"]}
-категория: {tx["category"]}
-описание: {tx["description"]}
-сумма: {tx["amount"]}""")
-
-    return "\n---\n".join(result)
+    return _format_transactions_markdown(transactions)
 
 
 def get_period_transactions_markdown(
@@ -519,16 +854,14 @@ def get_period_transactions_markdown(
     if not transactions:
         return "Нет транзакций за этот период"
 
-    result = []
-    for i, tx in enumerate(transactions, 1):
-        result.append(f"""Транзакция {i}:
-дата: {tx["date"]}
-тип: {tx["type"]}
-категория: {tx["category"]}
-описание: {tx["description"]}
-сумма: {tx["amount"]}""")
+    return _format_transactions_markdown(transactions)
+
 
-    return "\n---\n".join(result)
+def _format_transactions_markdown(transactions: list[dict]) -> str:
+    """Форматирует транзакции в Markdown-KV блоки, разделённые ---."""
+    return "\n---\n".join(
+        TRANSACTION_MARKDOWN_TEMPLATE.format(i=i, **tx) for i, tx in enumerate(transactions, 1)
+    )
 
 
 def get_expenses_by_category(year: int = None, month: int = None) -> dict:
@@ -544,47 +877,38 @@ def get_expenses_by_category(year: int = None, month: int = None) -> dict:
 
 def get_yearly_monthly_breakdown(year: int) -> dict:
     """Возвращает помесячную разбивку доходов и расходов за год."""
-    spreadsheet = get_spreadsheet()
-    worksheet = spreadsheet.worksheet("Транзакции")
-
-    all_values = worksheet.get_all_values()
-    if len(all_values) <= 1:
+    rows = _fetch_transaction_rows()
+    if not rows:
         return {
             "income": {m: 0 for m in range(1, 13)},
             "expenses": {m: 0 for m in range(1, 13)},
         }
 
-    income = {m: 0 for m in range(1, 13)}
-    expenses = {m: 0 for m in range(1, 13)}
-    year_str = str(year)
+    breakdown = _cached_summary(rows, ("year", year), lambda: _yearly_breakdown(rows, year))
+    return {"income": dict(breakdown["income"]), "expenses": dict(breakdown["expenses"])}
 
-    for row in all_values[1:]:
-        try:
-            date_str = row[0] if row[0] else ""
-            if not date_str.startswith(year_str):
-                continue
-
-            month = int(date_str[5:7])
-            amount = float(row[5]) if len(row) > 5 and row[5] else 0
-            tx_type = row[2] if len(row) > 2 else ""
 
-            if tx_type == "доход":
-                income[month] += amount
-            elif tx_type == "расход":
-                expenses[month] += amount
+def _yearly_breakdown(rows: list[list], year: int) -> dict:
+    """Считает помесячные доходы и расходы за год по снимку строк."""
+    year_frame = _get_period_frame(rows, f"{year}-01-01", f"{year}-12-31")
+    months = year_frame["month"].str[5:7].astype(int).to_numpy()
+    amounts = year_frame["amount"].to_numpy(dtype=np.float64)
+    types = year_frame["type"].to_numpy()
 
-        except (ValueError, IndexError):
-            continue
+    income = np.bincount(months, weights=amounts * (types == "доход"), minlength=13)
+    expenses = np.bincount(months, weights=amounts * (types == "расход"), minlength=13)
 
-    return {"income": income, "expenses": expenses}
+    return {
+        "income": dict(zip(range(1, 13), income[1:].astype(np.float64).tolist())),
+        "expenses": dict(zip(range(1, 13), expenses[1:].astype(np.float64).tolist())),
+    }
 
 
 def get_transactions_with_rows(limit: int = 15) -> list[dict]:
     """Возвращает последние транзакции с номерами строк в таблице."""
-    spreadsheet = get_spreadsheet()
-    worksheet = spreadsheet.worksheet("Транзакции")
+    worksheet = _get_worksheet("Транзакции")
 
-    all_values = worksheet.get_all_values()
+    all_values = _cached_values(worksheet)
     if len(all_values) <= 1:
         return []
 
@@ -610,10 +934,9 @@ def delete_transaction(row_number: int) -> dict:
     error_msg = None
 
     try:
-        spreadsheet = get_spreadsheet()
-        worksheet = spreadsheet.worksheet("Транзакции")
+        worksheet = _get_worksheet("Транзакции")
 
-        all_values = worksheet.get_all_values()
+        all_values = _with_retry(worksheet.get_all_values)
         total_rows = len(all_values)
 
         if row_number < 2 or row_number > total_rows:
@@ -623,11 +946,12 @@ def delete_transaction(row_number: int) -> dict:
         deleted_row = all_values[row_number - 1]
         deleted_tx = dict(zip(headers, deleted_row))
 
-        worksheet.delete_rows(row_number)
+        _with_retry(worksheet.delete_rows, row_number, retry_statuses=QUOTA_STATUSES)
+        _invalidate_transactions()
 
         if row_number == 2 and total_rows > 2:
             balance_formula = '=Сводка!$B$2 + IF(C2="доход"; F2; -F2)'
-            worksheet.update_acell("G2", balance_formula)
+            _with_retry(worksheet.update_acell, "G2", balance_formula)
 
         logger.info(f"Транзакция удалена: строка {row_number}, {deleted_tx.get('Описание', '')}")
         success = True
@@ -648,7 +972,7 @@ def create_backup() -> str:
     backup_name = f"Finance_Backup_{datetime.now().strftime('%Y%m%d_%H%M')}"
 
     client = get_client()
-    client.copy(spreadsheet.id, backup_name)
+    _with_retry(client.copy, spreadsheet.id, backup_name, retry_statuses=QUOTA_STATUSES)
 
     logger.info(f"Created backup: {backup_name}")
     return backup_name
@@ -656,34 +980,30 @@ def create_backup() -> str:
 
 def export_to_csv() -> str:
     """Экспортирует транзакции в CSV формат."""
-    spreadsheet = get_spreadsheet()
-    worksheet = spreadsheet.worksheet("Транзакции")
-
-    all_values = worksheet.get_all_values()
-    if len(all_values) <= 1:
-        return "Дата,Время,Тип,Категория,Описание,Сумма,Баланс\n"
-
-    lines = []
-    headers = all_values[0]
-    lines.append(",".join(headers))
-
-    for row in all_values[1:]:
-        line = ",".join([str(cell).replace(",", ";") for cell in row])
-        lines.append(line)
-
-    return "\n".join(lines)
+    all_values = _cached_values(_get_worksheet("Транзакции")) or [TRANSACTIONS_HEADERS]
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(all_values)
+    return buffer.getvalue()
 
 
 def get_enriched_analytics(
-    start_date: datetime, end_date: datetime, prev_start: datetime = None, prev_end: datetime = None
+    start_date: datetime,
+    end_date: datetime,
+    prev_start: datetime = None,
+    prev_end: datetime = None,
+    rows: list[list] | None = None,
 ) -> dict:
     """Возвращает обогащённые данные для AI-анализа."""
-    summary = get_period_summary(start_date, end_date)
+    if rows is None:
+        rows = _fetch_transaction_rows()
+
+    summary = get_period_summary(start_date, end_date, rows)
     transactions = summary.get("transactions", [])
+    scan = _scan_expenses(transactions)
 
     prev_summary = None
     if prev_start and prev_end:
-        prev_summary = get_period_summary(prev_start, prev_end)
+        prev_summary = get_period_summary(prev_start, prev_end, rows)
 
     enriched = {
         "totals": {
@@ -701,110 +1021,235 @@ def get_enriched_analytics(
             "transaction_count": len(transactions),
         },
         "categories": _analyze_categories(
-            transactions, summary.get("by_category", {}), prev_summary
+            transactions, summary.get("by_category", {}), prev_summary, scan
         ),
-        "patterns": _analyze_patterns(transactions),
+        "patterns": _analyze_patterns(transactions, scan),
         "comparison": _analyze_comparison(summary, prev_summary) if prev_summary else None,
     }
 
     return enriched
 
 
-def _analyze_categories(transactions: list, by_category: dict, prev_summary: dict = None) -> list:
+def build_month_report(year: int, month: int) -> dict:
+    """Собирает все данные для месячного отчёта за одно чтение листа."""
+    rows = _fetch_transaction_rows()
+
+    prev_month = month - 1 if month > 1 else 12
+    prev_year = year if month > 1 else year - 1
+
+    start_date = datetime(year, month, 1)
+    end_date = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+    prev_start = datetime(prev_year, prev_month, 1)
+
+    return {
+        "summary": get_month_summary(year, month, rows),
+        "previous_summary": get_month_summary(prev_year, prev_month, rows),
+        "enriched": get_enriched_analytics(start_date, end_date, prev_start, start_date, rows),
+    }
+
+
+def _scan_expenses(transactions: list) -> dict:
+    """Один проход по расходам: корзины категорий, суммы по дням недели, описания и разброс сумм."""
+    expenses = [t for t in transactions if t.get("type") == "расход"]
+    if len(expenses) >= VECTORIZE_MIN_EXPENSES:
+        return _scan_expenses_vectorized(expenses)
+
+    buckets = defaultdict(
+        lambda: {"count": 0, "total": 0, "max_tx": {}, "weekday": 0, "weekend": 0}
+    )
+    day_totals = [0] * 7
+    description_totals = defaultdict(float)
+    description_counts = defaultdict(int)
+    total = 0
+    mean = 0.0
+    m2 = 0.0
+
+    for seen, t in enumerate(expenses, start=1):
+        amount = t.get("amount", 0)
+        total += amount
+        delta = amount - mean
+        mean += delta / seen
+        m2 += delta * (amount - mean)
+
+        bucket = buckets[t.get("category")]
+        bucket["count"] += 1
+        bucket["total"] += amount
+        if amount > bucket["max_tx"].get("amount", 0) or not bucket["max_tx"]:
+            bucket["max_tx"] = t
+
+        weekday = _weekday(t.get("date", ""))
+        if weekday is not None:
+            day_totals[weekday] += amount
+            bucket["weekday" if weekday < 5 else "weekend"] += amount
+
+        desc = t.get("description", "").lower().strip()
+        if len(desc) >= 3:
+            key = desc[:30]
+            description_totals[key] += amount
+            description_counts[key] += 1
+
+    count = len(expenses)
+    return {
+        "expenses": expenses,
+        "categories": buckets,
+        "day_totals": day_totals,
+        "description_totals": description_totals,
+        "description_counts": description_counts,
+        "avg_amount": total / count if count else 0,
+        "std_amount": (m2 / count) ** 0.5 if count > 1 else 0,
+    }
+
+
+def _scan_expenses_vectorized(expenses: list) -> dict:
+    """Те же агрегаты, что и _scan_expenses, через bincount по кодам категорий."""
+    amounts = np.array([t.get("amount", 0) for t in expenses])
+    codes, names = pd.Series([t.get("category") for t in expenses], dtype=object).factorize(
+        use_na_sentinel=False
+    )
+    dates = pd.to_datetime(
+        pd.Series([t.get("date", "") for t in expenses], dtype=object),
+        format="%Y-%m-%d",
+        errors="coerce",
+    )
+    weekdays = dates.dt.dayofweek.fillna(-1).to_numpy(dtype=np.int64)
+    dated = weekdays >= 0
+    weekend = weekdays >= 5
+
+    n = len(names)
+    counts = np.bincount(codes, minlength=n)
+    totals = np.bincount(codes, weights=amounts, minlength=n).astype(amounts.dtype)
+    weekday_sums = np.bincount(codes, weights=amounts * (dated & ~weekend), minlength=n)
+    weekend_sums = np.bincount(codes, weights=amounts * weekend, minlength=n)
+    day_sums = np.bincount(weekdays[dated], weights=amounts[dated], minlength=7)
+
+    order = np.lexsort((-amounts, codes))
+    max_positions = order[np.searchsorted(codes[order], np.arange(n))]
+
+    buckets = {
+        expenses[position].get("category"): {
+            "count": count,
+            "total": total,
+            "max_tx": expenses[position],
+            "weekday": weekday,
+            "weekend": weekend_amount,
+        }
+        for count, total, position, weekday, weekend_amount in zip(
+            counts.tolist(),
+            totals.tolist(),
+            max_positions.tolist(),
+            weekday_sums.astype(amounts.dtype).tolist(),
+            weekend_sums.astype(amounts.dtype).tolist(),
+        )
+    }
+
+    description_totals = defaultdict(float)
+    description_counts = defaultdict(int)
+    for t, amount in zip(expenses, amounts.tolist()):
+        desc = t.get("description", "").lower().strip()
+        if len(desc) >= 3:
+            key = desc[:30]
+            description_totals[key] += amount
+            description_counts[key] += 1
+
+    return {
+        "expenses": expenses,
+        "amounts": amounts,
+        "categories": buckets,
+        "day_totals": day_sums.astype(amounts.dtype).tolist(),
+        "description_totals": description_totals,
+        "description_counts": description_counts,
+        "avg_amount": amounts.mean().item(),
+        "std_amount": amounts.std().item(),
+    }
+
+
+@lru_cache(maxsize=1024)
+def _weekday(date_str: str) -> Optional[int]:
+    """Возвращает день недели для ISO-даты или None, если дата битая."""
+    try:
+        return parse_date(date_str).weekday()
+    except (TypeError, ValueError):
+        return None
+
+
+def _analyze_categories(
+    transactions: list, by_category: dict, prev_summary: dict = None, scan: dict = None
+) -> list:
     """Анализирует категории с детальной статистикой."""
+    scan = scan or _scan_expenses(transactions)
     total_expenses = sum(by_category.values()) or 1
     prev_by_category = prev_summary.get("by_category", {}) if prev_summary else {}
 
-    categories = []
-    for cat_name, amount in sorted(by_category.items(), key=lambda x: x[1], reverse=True):
-        cat_transactions = [
-            t for t in transactions if t.get("category") == cat_name and t.get("type") == "расход"
-        ]
-
-        if not cat_transactions:
-            continue
-
-        amounts = [t.get("amount", 0) for t in cat_transactions]
-        max_tx = max(cat_transactions, key=lambda x: x.get("amount", 0), default={})
-
-        weekday_amount = 0
-        weekend_amount = 0
-        for t in cat_transactions:
-            try:
-                tx_date = datetime.strptime(t.get("date", ""), "%Y-%m-%d")
-                if tx_date.weekday() < 5:
-                    weekday_amount += t.get("amount", 0)
-                else:
-                    weekend_amount += t.get("amount", 0)
-            except ValueError:
-                continue
+    buckets = scan["categories"]
+    ranked = [
+        (cat_name, amount, buckets[cat_name])
+        for cat_name, amount in sorted(by_category.items(), key=lambda x: x[1], reverse=True)
+        if buckets.get(cat_name)
+    ]
 
+    categories = [None] * len(ranked)
+    for i, (cat_name, amount, bucket) in enumerate(ranked):
+        max_tx = bucket["max_tx"]
         prev_amount = prev_by_category.get(cat_name, 0)
         trend = round((amount - prev_amount) / prev_amount * 100, 1) if prev_amount > 0 else None
 
-        categories.append(
-            {
-                "name": cat_name,
-                "amount": amount,
-                "percent": round(amount / total_expenses * 100, 1),
-                "transaction_count": len(cat_transactions),
-                "avg_transaction": round(sum(amounts) / len(amounts)) if amounts else 0,
-                "max_transaction": {
-                    "amount": max_tx.get("amount", 0),
-                    "description": max_tx.get("description", ""),
-                },
-                "trend_vs_prev_period": trend,
-                "weekday_amount": weekday_amount,
-                "weekend_amount": weekend_amount,
-            }
-        )
+        categories[i] = {
+            "name": cat_name,
+            "amount": amount,
+            "percent": round(amount / total_expenses * 100, 1),
+            "transaction_count": bucket["count"],
+            "avg_transaction": round(bucket["total"] / bucket["count"]),
+            "max_transaction": {
+                "amount": max_tx.get("amount", 0),
+                "description": max_tx.get("description", ""),
+            },
+            "trend_vs_prev_period": trend,
+            "weekday_amount": bucket["weekday"],
+            "weekend_amount": bucket["weekend"],
+        }
 
     return categories
 
 
-def _analyze_patterns(transactions: list) -> dict:
+def _analyze_patterns(transactions: list, scan: dict = None) -> dict:
     """Анализирует паттерны в транзакциях."""
-    expense_transactions = [t for t in transactions if t.get("type") == "расход"]
+    scan = scan or _scan_expenses(transactions)
+    expense_transactions = scan["expenses"]
 
     if not expense_transactions:
         return {"anomalies": [], "top_descriptions": [], "time_patterns": {}}
 
-    amounts = [t.get("amount", 0) for t in expense_transactions]
-    avg_amount = sum(amounts) / len(amounts) if amounts else 0
-    std_amount = (
-        (sum((a - avg_amount) ** 2 for a in amounts) / len(amounts)) ** 0.5
-        if len(amounts) > 1
-        else 0
-    )
-    threshold = avg_amount + 2 * std_amount
+    avg_amount = scan["avg_amount"]
+    threshold = avg_amount + 2 * scan["std_amount"]
+
+    amounts = scan.get("amounts")
+    if amounts is None:
+        amounts = np.array([t.get("amount", 0) for t in expense_transactions])
+    candidates = np.flatnonzero((amounts > threshold) & (amounts > avg_amount * 3))
+    if len(candidates) > ANOMALY_LIMIT:
+        kth = np.partition(amounts[candidates], -ANOMALY_LIMIT)[-ANOMALY_LIMIT]
+        candidates = candidates[amounts[candidates] >= kth]
+    top = candidates[np.lexsort((candidates, -amounts[candidates]))][:ANOMALY_LIMIT]
 
     anomalies = []
-    for t in expense_transactions:
+    for position in top.tolist():
+        t = expense_transactions[position]
         amount = t.get("amount", 0)
-        if amount > threshold and amount > avg_amount * 3:
-            anomalies.append(
-                {
-                    "date": t.get("date"),
-                    "category": t.get("category"),
-                    "description": t.get("description"),
-                    "amount": amount,
-                    "times_avg": round(amount / avg_amount, 1) if avg_amount > 0 else 0,
-                }
-            )
-    anomalies = sorted(anomalies, key=lambda x: x["amount"], reverse=True)[:5]
+        anomalies.append(
+            {
+                "date": t.get("date"),
+                "category": t.get("category"),
+                "description": t.get("description"),
+                "amount": amount,
+                "times_avg": round(amount / avg_amount, 1) if avg_amount > 0 else 0,
+            }
+        )
 
-    description_totals = {}
-    description_counts = {}
-    for t in expense_transactions:
-        desc = t.get("description", "").lower().strip()
-        if len(desc) < 3:
-            continue
-        key = desc[:30]
-        description_totals[key] = description_totals.get(key, 0) + t.get("amount", 0)
-        description_counts[key] = description_counts.get(key, 0) + 1
+    description_totals = scan["description_totals"]
+    description_counts = scan["description_counts"]
 
     top_descriptions = []
-    for desc, total in sorted(description_totals.items(), key=lambda x: x[1], reverse=True)[:5]:
+    for desc, total in heapq.nlargest(5, description_totals.items(), key=itemgetter(1)):
         top_descriptions.append(
             {
                 "description": desc,
@@ -813,19 +1258,13 @@ def _analyze_patterns(transactions: list) -> dict:
             }
         )
 
-    day_totals = {i: 0 for i in range(7)}
-    for t in expense_transactions:
-        try:
-            tx_date = datetime.strptime(t.get("date", ""), "%Y-%m-%d")
-            day_totals[tx_date.weekday()] += t.get("amount", 0)
-        except ValueError:
-            continue
+    day_totals = scan["day_totals"]
 
     day_names = ["понедельник", "вторник", "среда", "четверг", "пятница", "суббота", "воскресенье"]
-    max_day_idx = max(day_totals, key=day_totals.get)
+    max_day_idx = max(range(7), key=day_totals.__getitem__)
 
-    weekday_total = sum(day_totals[i] for i in range(5))
-    weekend_total = sum(day_totals[i] for i in range(5, 7))
+    weekday_total = sum(day_totals[:5])
+    weekend_total = sum(day_totals[5:])
 
     time_patterns = {
         "most_expensive_day": day_names[max_day_idx],
@@ -863,8 +1302,7 @@ def _analyze_comparison(current: dict, previous: dict) -> dict:
     growing = []
     shrinking = []
 
-    all_categories = set(curr_by_cat.keys()) | set(prev_by_cat.keys())
-    for cat in all_categories:
+    for cat in curr_by_cat.keys() | prev_by_cat.keys():
         curr_val = curr_by_cat.get(cat, 0)
         prev_val = prev_by_cat.get(cat, 0)
 
@@ -889,14 +1327,11 @@ def _analyze_comparison(current: dict, previous: dict) -> dict:
                 }
             )
 
-    growing = sorted(growing, key=lambda x: x.get("change") or 999, reverse=True)
-    shrinking = sorted(shrinking, key=lambda x: x.get("change") or 0)
-
     return {
         "expenses_change": expenses_change,
         "income_change": income_change,
-        "growing_categories": growing[:3],
-        "shrinking_categories": shrinking[:3],
+        "growing_categories": heapq.nlargest(3, growing, key=lambda x: x.get("change") or 999),
+        "shrinking_categories": heapq.nsmallest(3, shrinking, key=lambda x: x.get("change") or 0),
         "prev_expenses": prev_expenses,
         "prev_income": prev_income,
     }
@@ -905,9 +1340,9 @@ def _analyze_comparison(current: dict, previous: dict) -> dict:
 def set_initial_balance(balance: float):
     """Устанавливает начальный баланс в Сводке."""
     try:
-        spreadsheet = get_spreadsheet()
-        summary = spreadsheet.worksheet("Сводка")
-        summary.update_acell("B2", balance)
+        summary = _get_worksheet("Сводка")
+        _with_retry(summary.update_acell, "B2", balance)
+        _invalidate_transactions()
         logger.info(f"Начальный баланс: {balance}")
     except Exception as e:
         logger.error(f"Ошибка установки баланса: {e}")
@@ -916,8 +1351,10 @@ def set_initial_balance(balance: float):
 def reset_spreadsheet():
     """Удаляет все листы и пересоздаёт структуру с нуля."""
     spreadsheet = get_spreadsheet()
+    _worksheets.clear()
+    _values_cache.clear()
 
-    sheets_to_delete = [
+    sheets_to_delete = {
         "Транзакции",
         "Сводка",
         "Графики",
@@ -926,14 +1363,21 @@ def reset_spreadsheet():
         "Dashboard",
         "Monthly",
         "Settings",
+    }
+    metadata = _with_retry(spreadsheet.fetch_sheet_metadata)
+    deleted = [
+        sheet["properties"]
+        for sheet in metadata.get("sheets", [])
+        if sheet["properties"]["title"] in sheets_to_delete
     ]
-    for sheet_name in sheets_to_delete:
-        try:
-            sheet = spreadsheet.worksheet(sheet_name)
-            spreadsheet.del_worksheet(sheet)
-            logger.info(f"Удалён лист: {sheet_name}")
-        except gspread.WorksheetNotFound:
-            pass
+    if deleted:
+        _with_retry(
+            spreadsheet.batch_update,
+            {"requests": [{"deleteSheet": {"sheetId": props["sheetId"]}} for props in deleted]},
+        )
+        for props in deleted:
+            logger.info(f"Удалён лист: {props['title']}")
 
+    _invalidate_transactions()
     init_spreadsheet()
     logger.info("Таблица пересоздана")
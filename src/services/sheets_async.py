@@ -2,92 +2,136 @@ import asyncio
 import functools
 import logging
 from concurrent.futures import ThreadPoolExecutor
-from typing import Callable
+from typing import Callable, Optional
+
+from src.config import SHEETS_THREAD_POOL_SIZE
+from src.services import sheets
 
 logger = logging.getLogger(__name__)
 
-_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="sheets_")
+_executor = ThreadPoolExecutor(max_workers=SHEETS_THREAD_POOL_SIZE, thread_name_prefix="sheets_")
+
+WRITE_BATCH_SIZE = 20
+WRITE_QUEUE_SIZE = 500
 
+_write_queue: Optional[asyncio.Queue] = None
+_writer_task: Optional[asyncio.Task] = None
 
+
+@functools.lru_cache(maxsize=None)
 def run_in_executor(func: Callable) -> Callable:
     @functools.wraps(func)
     async def wrapper(*args, **kwargs):
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+        loop = asyncio.get_running_loop()
+        if kwargs:
+            return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+        return await loop.run_in_executor(_executor, func, *args)
 
     return wrapper
 
 
 async def async_add_transaction(transaction):
-    from src.services.sheets import add_transaction
-
-    return await run_in_executor(add_transaction)(transaction)
+    """Ставит транзакцию в очередь записи и ждёт её номер."""
+    future = asyncio.get_running_loop().create_future()
+    await _get_write_queue().put((transaction, future))
+    return await future
+
+
+def _get_write_queue() -> asyncio.Queue:
+    global _write_queue, _writer_task
+    if _write_queue is None:
+        _write_queue = asyncio.Queue(maxsize=WRITE_QUEUE_SIZE)
+    if _writer_task is None or _writer_task.done():
+        _writer_task = asyncio.create_task(_flush_writes(_write_queue))
+    return _write_queue
+
+
+async def _flush_writes(queue: asyncio.Queue):
+    """Пишет очередь пачками: всё, что накопилось за время записи, уходит одним append_rows."""
+    while True:
+        batch = [await queue.get()]
+        while len(batch) < WRITE_BATCH_SIZE and not queue.empty():
+            batch.append(queue.get_nowait())
+
+        transactions = [tx for tx, _ in batch]
+        try:
+            tx_ids = await run_in_executor(sheets.add_transactions)(transactions)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for (_, future), tx_id in zip(batch, tx_ids):
+                if not future.done():
+                    future.set_result(tx_id)
+        finally:
+            for _ in batch:
+                queue.task_done()
+
+
+async def stop_write_queue():
+    """Дожидается записи поставленных транзакций и останавливает фоновую задачу."""
+    global _write_queue, _writer_task
+    if _write_queue is not None and _writer_task is not None and not _writer_task.done():
+        await _write_queue.join()
+    if _writer_task is not None:
+        _writer_task.cancel()
+    _write_queue = None
+    _writer_task = None
 
 
 async def async_get_transactions(limit: int = 10, offset: int = 0):
-    from src.services.sheets import get_transactions
+    return await run_in_executor(sheets.get_transactions)(limit, offset)
 
-    return await run_in_executor(get_transactions)(limit, offset)
 
+async def async_get_current_balance():
+    return await run_in_executor(sheets.get_current_balance)()
 
-async def async_get_month_summary(year: int, month: int):
-    from src.services.sheets import get_month_summary
 
-    return await run_in_executor(get_month_summary)(year, month)
+async def async_get_month_summary(year: int, month: int):
+    return await run_in_executor(sheets.get_month_summary)(year, month)
 
 
 async def async_get_period_summary(start_date, end_date):
-    from src.services.sheets import get_period_summary
-
-    return await run_in_executor(get_period_summary)(start_date, end_date)
+    return await run_in_executor(sheets.get_period_summary)(start_date, end_date)
 
 
 async def async_get_enriched_analytics(start_date, end_date, prev_start=None, prev_end=None):
-    from src.services.sheets import get_enriched_analytics
-
-    return await run_in_executor(get_enriched_analytics)(start_date, end_date, prev_start, prev_end)
+    return await run_in_executor(sheets.get_enriched_analytics)(
+        start_date, end_date, prev_start, prev_end
+    )
 
 
 async def async_get_expenses_by_category(year: int = None, month: int = None):
-    from src.services.sheets import get_expenses_by_category
-
-    return await run_in_executor(get_expenses_by_category)(year, month)
+    return await run_in_executor(sheets.get_expenses_by_category)(year, month)
 
 
 async def async_get_yearly_monthly_breakdown(year: int):
-    from src.services.sheets import get_yearly_monthly_breakdown
-
-    return await run_in_executor(get_yearly_monthly_breakdown)(year)
+    return await run_in_executor(sheets.get_yearly_monthly_breakdown)(year)
 
 
 async def async_get_transactions_with_rows(limit: int = 15):
-    from src.services.sheets import get_transactions_with_rows
-
-    return await run_in_executor(get_transactions_with_rows)(limit)
+    return await run_in_executor(sheets.get_transactions_with_rows)(limit)
 
 
 async def async_delete_transaction(row_number: int):
-    from src.services.sheets import delete_transaction
-
-    return await run_in_executor(delete_transaction)(row_number)
+    return await run_in_executor(sheets.delete_transaction)(row_number)
 
 
 async def async_create_backup():
-    from src.services.sheets import create_backup
-
-    return await run_in_executor(create_backup)()
+    return await run_in_executor(sheets.create_backup)()
 
 
 async def async_export_to_csv():
-    from src.services.sheets import export_to_csv
-
-    return await run_in_executor(export_to_csv)()
+    return await run_in_executor(sheets.export_to_csv)()
 
 
 async def async_init_spreadsheet():
-    from src.services.sheets import init_spreadsheet
+    return await run_in_executor(sheets.init_spreadsheet)()
+
 
-    return await run_in_executor(init_spreadsheet)()
+async def async_warm_up():
+    return await run_in_executor(sheets.warm_up)()
 
 
 def shutdown_executor():
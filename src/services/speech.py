@@ -1,41 +1,76 @@
 import asyncio
 import logging
+import time
 from pathlib import Path
 
 import aiohttp
 
 from src.config import YANDEX_GPT_API_KEY, YANDEX_GPT_FOLDER_ID
-from src.utils.audio import convert_ogg_to_pcm
+from src.utils.audio import convert_ogg_to_pcm_bytes
+from src.utils.http import KEEPALIVE_TIMEOUT, get_shared_connector
 from src.utils.metrics_decorator import track_service_call
 
 logger = logging.getLogger(__name__)
 
 SPEECHKIT_URL = "https://stt.api.cloud.yandex.net/speech/v1/stt:recognize"
 MAX_RETRIES = 3
+KEEPALIVE_INTERVAL = KEEPALIVE_TIMEOUT - 15
+KEEPALIVE_IDLE_LIMIT = 300
+PCM_CONTENT_TYPE = "audio/x-pcm;bit=16;rate=16000"
 
 _speech_session: aiohttp.ClientSession | None = None
+_keepalive_task: asyncio.Task | None = None
+_last_request_at = 0.0
 
 
 async def get_speech_session() -> aiohttp.ClientSession:
-    global _speech_session
+    global _speech_session, _keepalive_task, _last_request_at
+    _last_request_at = time.monotonic()
     if _speech_session is None or _speech_session.closed:
         timeout = aiohttp.ClientTimeout(total=120, connect=30, sock_read=60)
-        connector = aiohttp.TCPConnector(
-            limit=10,
-            limit_per_host=5,
-            ttl_dns_cache=300,
-            force_close=False,
-            enable_cleanup_closed=True,
-        )
         _speech_session = aiohttp.ClientSession(
-            timeout=timeout, connector=connector, raise_for_status=False
+            timeout=timeout,
+            connector=get_shared_connector(),
+            connector_owner=False,
+            raise_for_status=False,
         )
         logger.info("SpeechKit session created")
+
+    if _keepalive_task is None or _keepalive_task.done():
+        _keepalive_task = asyncio.create_task(_keepalive_loop(_speech_session))
     return _speech_session
 
 
+async def _keepalive_loop(session: aiohttp.ClientSession):
+    """Держит тёплое соединение с SpeechKit, пока голосовые приходят; после простоя затихает."""
+    global _keepalive_task
+    try:
+        while not session.closed:
+            await asyncio.sleep(KEEPALIVE_INTERVAL)
+            if time.monotonic() - _last_request_at > KEEPALIVE_IDLE_LIMIT:
+                logger.debug("SpeechKit keepalive stopped after idle period")
+                return
+            try:
+                async with session.head(SPEECHKIT_URL, allow_redirects=False) as response:
+                    if not 200 <= response.status < 300:
+                        logger.warning(f"SpeechKit keepalive got status {response.status}")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.debug(f"SpeechKit keepalive failed: {e}")
+    finally:
+        if _keepalive_task is asyncio.current_task():
+            _keepalive_task = None
+
+
 async def close_speech_session():
-    global _speech_session
+    global _speech_session, _keepalive_task
+    if _keepalive_task and not _keepalive_task.done():
+        _keepalive_task.cancel()
+        try:
+            await _keepalive_task
+        except asyncio.CancelledError:
+            pass
+    _keepalive_task = None
+
     if _speech_session and not _speech_session.closed:
         await _speech_session.close()
         _speech_session = None
@@ -50,12 +85,7 @@ async def transcribe(audio_path: Path) -> str | None:
         return None
 
     try:
-        pcm_path = await convert_ogg_to_pcm(audio_path)
-
-        loop = asyncio.get_event_loop()
-        audio_data = await loop.run_in_executor(None, lambda: pcm_path.read_bytes())
-
-        pcm_path.unlink(missing_ok=True)
+        audio_data = await convert_ogg_to_pcm_bytes(audio_path)
 
         logger.info(f"Audio size: {len(audio_data)} bytes")
 
@@ -70,6 +100,7 @@ async def transcribe(audio_path: Path) -> str | None:
             "sampleRateHertz": 16000,
         }
 
+        payload = aiohttp.BytesPayload(audio_data, content_type=PCM_CONTENT_TYPE)
         session = await get_speech_session()
 
         last_error = None
@@ -80,7 +111,7 @@ async def transcribe(audio_path: Path) -> str | None:
                     SPEECHKIT_URL,
                     headers=headers,
                     params=params,
-                    data=audio_data,
+                    data=payload,
                 ) as response:
                     if response.status != 200:
                         error_text = await response.text()
@@ -1,14 +1,13 @@
 import asyncio
 import logging
 import time
-from collections import deque
 from dataclasses import dataclass
-from typing import Dict
+from typing import Dict, Optional
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ThrottleConfig:
     max_requests_per_second: float = 10.0
     max_requests_per_minute: float = 100.0
@@ -18,49 +17,50 @@ class ThrottleConfig:
 class RateLimiter:
     def __init__(self, config: ThrottleConfig):
         self.config = config
-        self.requests_last_second: deque = deque(maxlen=int(config.max_requests_per_second * 2))
-        self.requests_last_minute: deque = deque(maxlen=int(config.max_requests_per_minute * 2))
+        self.second_level = 0.0
+        self.minute_level = 0.0
+        self.updated_at = time.monotonic()
         self._lock = asyncio.Lock()
 
     async def acquire(self, wait: bool = True) -> bool:
-        async with self._lock:
-            now = time.time()
-
-            self._cleanup_old_requests(now)
-
-            second_count = sum(1 for t in self.requests_last_second if now - t < 1.0)
-            minute_count = sum(1 for t in self.requests_last_minute if now - t < 60.0)
-
-            if second_count >= self.config.max_requests_per_second:
-                if not wait:
-                    return False
-
-                wait_time = 1.0 - (now - self.requests_last_second[0])
-                logger.warning(f"Rate limit hit (per second), waiting {wait_time:.2f}s")
-                await asyncio.sleep(wait_time)
-                return await self.acquire(wait=False)
-
-            if minute_count >= self.config.max_requests_per_minute:
-                if not wait:
-                    return False
-
-                wait_time = 60.0 - (now - self.requests_last_minute[0])
-                logger.warning(f"Rate limit hit (per minute), waiting {wait_time:.2f}s")
-                await asyncio.sleep(wait_time)
-                return await self.acquire(wait=False)
-
-            self.requests_last_second.append(now)
-            self.requests_last_minute.append(now)
-            return True
-
-    def _cleanup_old_requests(self, now: float):
-        cutoff_second = now - 1.0
-        while self.requests_last_second and self.requests_last_second[0] < cutoff_second:
-            self.requests_last_second.popleft()
-
-        cutoff_minute = now - 60.0
-        while self.requests_last_minute and self.requests_last_minute[0] < cutoff_minute:
-            self.requests_last_minute.popleft()
+        while True:
+            await self._lock.acquire()
+            try:
+                wait_time, window = self._reserve(time.monotonic())
+            finally:
+                self._lock.release()
+
+            if wait_time is None:
+                return True
+            if not wait:
+                return False
+
+            logger.warning(f"Rate limit hit ({window}), waiting {wait_time:.2f}s")
+            await asyncio.sleep(wait_time)
+
+    def _reserve(self, now: float) -> tuple[Optional[float], Optional[str]]:
+        self._leak(now)
+        per_second = self.config.max_requests_per_second
+        per_minute = self.config.max_requests_per_minute
+
+        if self.second_level + 1 > per_second:
+            return (self.second_level + 1 - per_second) / per_second, "per second"
+        if self.minute_level + 1 > per_minute:
+            return (self.minute_level + 1 - per_minute) * 60.0 / per_minute, "per minute"
+
+        self.second_level += 1
+        self.minute_level += 1
+        return None, None
+
+    def _leak(self, now: float):
+        elapsed = now - self.updated_at
+        self.updated_at = now
+        self.second_level = max(
+            0.0, self.second_level - elapsed * self.config.max_requests_per_second
+        )
+        self.minute_level = max(
+            0.0, self.minute_level - elapsed * self.config.max_requests_per_minute / 60.0
+        )
 
 
 class ThrottleManager:
@@ -88,8 +88,8 @@ class ThrottleManager:
         logger.warning("Enabling degraded mode - applying rate limits")
         self.is_degraded = True
 
-        for operation_type in self.rate_limiters:
-            self.rate_limiters[operation_type] = RateLimiter(self._degraded_config)
+        for limiter in self.rate_limiters.values():
+            limiter.config = self._degraded_config
 
     def disable_degraded_mode(self):
         if not self.is_degraded:
@@ -98,8 +98,8 @@ class ThrottleManager:
         logger.info("Disabling degraded mode - removing rate limits")
         self.is_degraded = False
 
-        for operation_type in self.rate_limiters:
-            self.rate_limiters[operation_type] = RateLimiter(self._normal_config)
+        for limiter in self.rate_limiters.values():
+            limiter.config = self._normal_config
 
     async def acquire(self, operation_type: str, wait: bool = True) -> bool:
         if operation_type not in self.rate_limiters:
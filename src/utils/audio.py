@@ -2,25 +2,32 @@ import asyncio
 import logging
 from pathlib import Path
 
+try:
+    import av
+    from av.audio.resampler import AudioResampler
+except ImportError:
+    av = None
+
 logger = logging.getLogger(__name__)
 
+PCM_SAMPLE_RATE = 16000
 
-async def convert_ogg_to_pcm(ogg_path: Path) -> Path:
-    """Конвертирует OGG файл в raw PCM для SpeechKit."""
-    pcm_path = ogg_path.with_suffix(".pcm")
 
+async def _run_ffmpeg(ogg_path: Path) -> bytes:
+    """Запускает ffmpeg с выводом raw PCM 16 кГц моно в stdout и возвращает его."""
     cmd = [
         "ffmpeg",
         "-i",
         str(ogg_path),
         "-ar",
-        "16000",
+        str(PCM_SAMPLE_RATE),
         "-ac",
         "1",
         "-f",
         "s16le",
-        "-y",
-        str(pcm_path),
+        "-loglevel",
+        "error",
+        "pipe:1",
     ]
 
     process = await asyncio.create_subprocess_exec(
@@ -34,5 +41,30 @@ async def convert_ogg_to_pcm(ogg_path: Path) -> Path:
         logger.error(f"FFmpeg conversion failed: {error_msg}")
         raise RuntimeError(f"FFmpeg conversion failed: {error_msg}")
 
-    logger.info(f"Converted {ogg_path.name} to {pcm_path.name}")
-    return pcm_path
+    return stdout
+
+
+def _decode_to_pcm(ogg_path: Path) -> bytes:
+    """Декодирует аудио через PyAV в raw PCM s16le 16 кГц моно, без запуска ffmpeg."""
+    resampler = AudioResampler(format="s16", layout="mono", rate=PCM_SAMPLE_RATE)
+    pcm = bytearray()
+
+    with av.open(str(ogg_path)) as container:
+        for frame in container.decode(audio=0):
+            for resampled in resampler.resample(frame):
+                pcm += resampled.to_ndarray().tobytes()
+
+    for resampled in resampler.resample(None):
+        pcm += resampled.to_ndarray().tobytes()
+
+    return bytes(pcm)
+
+
+async def convert_ogg_to_pcm_bytes(ogg_path: Path) -> bytes:
+    """Конвертирует OGG в raw PCM для SpeechKit: в процессе через PyAV, иначе через stdout ffmpeg."""
+    if av is not None:
+        pcm_data = await asyncio.to_thread(_decode_to_pcm, ogg_path)
+    else:
+        pcm_data = await _run_ffmpeg(ogg_path)
+    logger.info(f"Converted {ogg_path.name} to {len(pcm_data)} bytes of PCM")
+    return pcm_data
@@ -28,7 +28,7 @@ class CircuitBreaker:
 
     async def call(self, func: Callable, *args, **kwargs) -> Any:
         if self.state == CircuitState.OPEN:
-            if time.time() - self.last_failure_time >= self.recovery_timeout:
+            if time.monotonic() - self.last_failure_time >= self.recovery_timeout:
                 self.state = CircuitState.HALF_OPEN
                 logger.info("Circuit breaker transitioning to HALF_OPEN state")
             else:
@@ -50,7 +50,7 @@ class CircuitBreaker:
 
     def _on_failure(self):
         self.failure_count += 1
-        self.last_failure_time = time.time()
+        self.last_failure_time = time.monotonic()
 
         if self.failure_count >= self.failure_threshold:
             self.state = CircuitState.OPEN
@@ -1,49 +1,69 @@
 from datetime import datetime
-
-MONTHS_RU = {
-    1: "Январь",
-    2: "Февраль",
-    3: "Март",
-    4: "Апрель",
-    5: "Май",
-    6: "Июнь",
-    7: "Июль",
-    8: "Август",
-    9: "Сентябрь",
-    10: "Октябрь",
-    11: "Ноябрь",
-    12: "Декабрь",
-}
-
-MONTHS_RU_SHORT = {
-    1: "Янв",
-    2: "Фев",
-    3: "Мар",
-    4: "Апр",
-    5: "Май",
-    6: "Июн",
-    7: "Июл",
-    8: "Авг",
-    9: "Сен",
-    10: "Окт",
-    11: "Ноя",
-    12: "Дек",
-}
+from functools import lru_cache
+
+MONTHS_RU = (
+    "",
+    "Январь",
+    "Февраль",
+    "Март",
+    "Апрель",
+    "Май",
+    "Июнь",
+    "Июль",
+    "Август",
+    "Сентябрь",
+    "Октябрь",
+    "Ноябрь",
+    "Декабрь",
+)
+
+MONTHS_RU_SHORT = (
+    "",
+    "Янв",
+    "Фев",
+    "Мар",
+    "Апр",
+    "Май",
+    "Июн",
+    "Июл",
+    "Авг",
+    "Сен",
+    "Окт",
+    "Ноя",
+    "Дек",
+)
+
+TRANSACTION_KEYS_RU = ("Дата", "Категория", "Сумма", "Тип")
+TRANSACTION_KEYS_EN = ("Date", "Category", "Amount", "Type")
+TRANSACTION_DEFAULTS = ("", "", "0", "expense")
+INCOME_TYPES = frozenset({"income", "доход"})
+AMOUNT_CLEANUP = str.maketrans("", "", "\xa0 ")
+THOUSANDS_SEPARATOR = str.maketrans(",", " ")
+
+
+@lru_cache(maxsize=4096)
+def parse_date(value: str) -> datetime:
+    """Разбирает дату YYYY-MM-DD; результат кэшируется, так как даты в выборках повторяются."""
+    if len(value) == 10 and value[4] == "-" and value[7] == "-":
+        return datetime(int(value[:4]), int(value[5:7]), int(value[8:10]))
+    return datetime.strptime(value, "%Y-%m-%d")
 
 
 def month_name(month: int) -> str:
     """Возвращает название месяца на русском."""
-    return MONTHS_RU.get(month, str(month))
+    return MONTHS_RU[month] if 1 <= month <= 12 else str(month)
 
 
 def month_name_short(month: int) -> str:
     """Возвращает сокращенное название месяца."""
-    return MONTHS_RU_SHORT.get(month, str(month))
+    return MONTHS_RU_SHORT[month] if 1 <= month <= 12 else str(month)
 
 
 def format_amount(amount: float, with_sign: bool = False) -> str:
     """Форматирует сумму для отображения."""
-    formatted = f"{amount:,.0f}".replace(",", " ")
+    formatted = format(amount, ",.0f")
+    if abs(amount) >= 999.5:
+        formatted = formatted.translate(THOUSANDS_SEPARATOR)
     if with_sign and amount > 0:
         return f"+{formatted}"
     return formatted
@@ -54,24 +74,23 @@ def format_transaction_list(transactions: list[dict]) -> str:
     if not transactions:
         return "Пока транзакций нет."
 
+    keys = TRANSACTION_KEYS_RU if "Дата" in transactions[0] else TRANSACTION_KEYS_EN
+
     lines = []
     for tx in transactions:
-        date = tx.get("Дата", tx.get("Date", ""))
-        category = tx.get("Категория", tx.get("Category", ""))
-        amount = tx.get("Сумма", tx.get("Amount", "0"))
-        tx_type = tx.get("Тип", tx.get("Type", "expense"))
+        date, category, amount, tx_type = map(tx.get, keys, TRANSACTION_DEFAULTS)
 
-        try:
-            date_obj = datetime.strptime(date, "%Y-%m-%d")
-            date_str = date_obj.strftime("%d.%m")
-        except ValueError:
-            date_str = date
+        date_str = date
+        if len(date) == 10 and date[4] == "-":
+            try:
+                date_str = parse_date(date).strftime("%d.%m")
+            except ValueError:
+                pass
 
-        is_income = tx_type in ("income", "доход")
-        sign = "+" if is_income else "−"
+        sign = "+" if tx_type in INCOME_TYPES else "−"
 
         try:
-            amount_clean = str(amount).replace("\xa0", "").replace(" ", "")
+            amount_clean = str(amount).translate(AMOUNT_CLEANUP)
             amount_str = f"{float(amount_clean):,.0f}".replace(",", " ")
         except ValueError:
             amount_str = amount
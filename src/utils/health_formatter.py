@@ -1,11 +1,41 @@
 from datetime import datetime
-from typing import Any, Dict
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+SECTION_SEPARATOR = "━━━━━━━━━━━━━━━━━━━━━━━━"
+OPERATIONS_SECTION = ("", SECTION_SEPARATOR, "🎯 ОПЕРАЦИИ ПО ТИПАМ", "")
+SERVICES_SECTION = ("", SECTION_SEPARATOR, "🔌 ВНЕШНИЕ СЕРВИСЫ", "")
+
+STATUS_INDICATORS = {
+    "healthy": "✅",
+    "degraded": "⚠️",
+    "unhealthy": "❌",
+    "not_configured": "⚪",
+    "configured": "✅",
+    "timeout": "⏱",
+    "error": "❌",
+}
+
+OPERATION_EMOJI = {
+    "voice": "🎤",
+    "text": "💬",
+    "callback": "🔘",
+    "ai": "🤖",
+    "sheets": "📊",
+}
+
+SERVICE_NAMES = {
+    "telegram": "Telegram API",
+    "yandex_gpt": "Yandex GPT",
+    "yandex_stt": "Yandex STT",
+    "google_sheets": "Google Sheets",
+}
 
 
 def format_uptime(uptime_seconds: float) -> str:
-    days = int(uptime_seconds // 86400)
-    hours = int((uptime_seconds % 86400) // 3600)
-    minutes = int((uptime_seconds % 3600) // 60)
+    days, remainder = divmod(int(uptime_seconds), 86400)
+    hours, remainder = divmod(remainder, 3600)
+    minutes = remainder // 60
 
     parts = []
     if days > 0:
@@ -25,31 +55,27 @@ def format_memory(memory_mb: float) -> str:
         return f"{memory_mb / 1024:.2f} ГБ"
 
 
+@lru_cache(maxsize=16)
 def get_status_indicator(status: str) -> str:
-    indicators = {
-        "healthy": "✅",
-        "degraded": "⚠️",
-        "unhealthy": "❌",
-        "not_configured": "⚪",
-        "configured": "✅",
-        "timeout": "⏱",
-        "error": "❌",
-    }
-    return indicators.get(status.lower(), "❓")
-
-
-def format_time_ago(dt: datetime) -> str:
-    now = datetime.now()
-    diff = now - dt
-
-    if diff.total_seconds() < 60:
-        return f"{int(diff.total_seconds())} сек назад"
-    elif diff.total_seconds() < 3600:
-        return f"{int(diff.total_seconds() / 60)} мин назад"
-    elif diff.total_seconds() < 86400:
-        return f"{int(diff.total_seconds() / 3600)} ч назад"
+    return STATUS_INDICATORS.get(status.lower(), "❓")
+
+
+@lru_cache(maxsize=128)
+def _parse_timestamp(value: str) -> datetime:
+    return datetime.fromisoformat(value)
+
+
+def format_time_ago(dt: datetime, now: Optional[datetime] = None) -> str:
+    seconds = int(((now or datetime.now()) - dt).total_seconds())
+
+    if seconds < 60:
+        return f"{seconds} сек назад"
+    elif seconds < 3600:
+        return f"{seconds // 60} мин назад"
+    elif seconds < 86400:
+        return f"{seconds // 3600} ч назад"
     else:
-        return f"{int(diff.total_seconds() / 86400)} д назад"
+        return f"{seconds // 86400} д назад"
 
 
 def format_health_report(
@@ -58,6 +84,7 @@ def format_health_report(
     request_types: Dict[str, Dict[str, Any]],
     health_checks: Dict[str, Dict[str, Any]],
 ) -> str:
+    now = datetime.now()
     status = metrics_summary.get("status", "unknown")
     status_emoji = get_status_indicator(status)
 
@@ -80,19 +107,19 @@ def format_health_report(
     report_lines = [
         f"{status_emoji} СОСТОЯНИЕ БОТА",
         "",
-        "━━━━━━━━━━━━━━━━━━━━━━━━",
+        SECTION_SEPARATOR,
         "📊 ОБЩАЯ ИНФОРМАЦИЯ",
         "",
         f"Статус: {status.upper()}",
         f"Время работы: {uptime_formatted}",
         "",
-        "━━━━━━━━━━━━━━━━━━━━━━━━",
+        SECTION_SEPARATOR,
         "💻 РЕСУРСЫ СЕРВЕРА",
         "",
         f"Память: {memory_formatted} ({memory_percent:.1f}%)",
         f"CPU: {cpu_percent:.1f}%",
         "",
-        "━━━━━━━━━━━━━━━━━━━━━━━━",
+        SECTION_SEPARATOR,
         "📈 СТАТИСТИКА ЗАПРОСОВ",
         "",
         f"Всего запросов: {total_requests}",
@@ -106,18 +133,12 @@ def format_health_report(
     ]
 
     if request_types:
-        report_lines.extend(["", "━━━━━━━━━━━━━━━━━━━━━━━━", "🎯 ОПЕРАЦИИ ПО ТИПАМ", ""])
+        report_lines.extend(OPERATIONS_SECTION)
 
         for op_type, stats in sorted(
             request_types.items(), key=lambda x: x[1]["count"], reverse=True
         ):
-            type_emoji = {
-                "voice": "🎤",
-                "text": "💬",
-                "callback": "🔘",
-                "ai": "🤖",
-                "sheets": "📊",
-            }.get(op_type, "📌")
+            type_emoji = OPERATION_EMOJI.get(op_type, "📌")
 
             count = stats["count"]
             avg_duration = stats["avg_duration"]
@@ -127,61 +148,46 @@ def format_health_report(
                 f"{type_emoji} {op_type.capitalize()}: {count} ({type_success_rate:.1f}%, ~{avg_duration * 1000:.0f}мс)"
             )
 
-    report_lines.extend(["", "━━━━━━━━━━━━━━━━━━━━━━━━", "🔌 ВНЕШНИЕ СЕРВИСЫ", ""])
-
-    service_order = ["telegram", "yandex_gpt", "yandex_stt", "google_sheets"]
-    service_names = {
-        "telegram": "Telegram API",
-        "yandex_gpt": "Yandex GPT",
-        "yandex_stt": "Yandex STT",
-        "google_sheets": "Google Sheets",
-    }
-
-    for service_key in service_order:
-        health = health_checks.get(service_key, {})
-        stats = services_status.get(service_key, {})
-
-        service_name = service_names.get(service_key, service_key)
-        service_status = health.get("status", "unknown")
-        status_emoji = get_status_indicator(service_status)
-
-        message = health.get("message", "Нет данных")
-
-        last_success = stats.get("last_success")
-        last_failure = stats.get("last_failure")
-
-        status_line = f"{status_emoji} {service_name}: {message}"
-        report_lines.append(status_line)
-
-        if last_success:
-            last_success_dt = datetime.fromisoformat(last_success)
-            report_lines.append(f"   └─ Последний успех: {format_time_ago(last_success_dt)}")
-
-        if last_failure:
-            last_failure_dt = datetime.fromisoformat(last_failure)
-            last_error = stats.get("last_error", "")
-            error_msg = (
-                f" ({last_error[:50]}...)"
-                if last_error and len(last_error) > 50
-                else f" ({last_error})"
-                if last_error
-                else ""
-            )
-            report_lines.append(
-                f"   └─ Последняя ошибка: {format_time_ago(last_failure_dt)}{error_msg}"
-            )
+    report_lines.extend(SERVICES_SECTION)
+
+    for service_key, service_name in SERVICE_NAMES.items():
+        _render_service(
+            service_name,
+            health_checks.get(service_key, {}),
+            services_status.get(service_key, {}),
+            now,
+            report_lines,
+        )
 
     report_lines.extend(
-        [
-            "",
-            "━━━━━━━━━━━━━━━━━━━━━━━━",
-            f"⏰ Обновлено: {datetime.now().strftime('%d.%m.%Y %H:%M:%S')}",
-        ]
+        ("", SECTION_SEPARATOR, f"⏰ Обновлено: {now.strftime('%d.%m.%Y %H:%M:%S')}")
     )
 
     return "\n".join(report_lines)
 
 
+def _render_service(
+    service_name: str, health: Dict[str, Any], stats: Dict[str, Any], now: datetime, out: list
+) -> None:
+    status_emoji = get_status_indicator(health.get("status", "unknown"))
+    out.append(f"{status_emoji} {service_name}: {health.get('message', 'Нет данных')}")
+
+    if last_success := stats.get("last_success"):
+        time_ago = format_time_ago(_parse_timestamp(last_success), now)
+        out.append(f"   └─ Последний успех: {time_ago}")
+
+    if last_failure := stats.get("last_failure"):
+        time_ago = format_time_ago(_parse_timestamp(last_failure), now)
+        last_error = stats.get("last_error")
+        if not last_error:
+            error_msg = ""
+        elif len(last_error) > 50:
+            error_msg = f" ({last_error[:50]}...)"
+        else:
+            error_msg = f" ({last_error})"
+        out.append(f"   └─ Последняя ошибка: {time_ago}{error_msg}")
+
+
 def format_short_health_status(metrics_summary: Dict[str, Any]) -> str:
     status = metrics_summary.get("status", "unknown")
     status_emoji = get_status_indicator(status)
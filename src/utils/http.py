@@ -0,0 +1,32 @@
+import logging
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+KEEPALIVE_TIMEOUT = 75
+
+_shared_connector: aiohttp.TCPConnector | None = None
+
+
+def get_shared_connector() -> aiohttp.TCPConnector:
+    """Возвращает общий TCPConnector: один пул keep-alive соединений и один DNS-кэш на весь бот."""
+    global _shared_connector
+    if _shared_connector is None or _shared_connector.closed:
+        _shared_connector = aiohttp.TCPConnector(
+            limit=50,
+            limit_per_host=10,
+            ttl_dns_cache=300,
+            keepalive_timeout=KEEPALIVE_TIMEOUT,
+            enable_cleanup_closed=True,
+        )
+        logger.info("Shared HTTP connector created")
+    return _shared_connector
+
+
+async def close_shared_connector():
+    global _shared_connector
+    if _shared_connector and not _shared_connector.closed:
+        await _shared_connector.close()
+        logger.info("Shared HTTP connector closed")
+    _shared_connector = None
@@ -16,6 +16,21 @@ class ColoredFormatter(logging.Formatter):
     BOLD = "\033[1m"
     DIM = "\033[2m"
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._last_timestamp = (None, "")
+
+    def formatTime(self, record, datefmt=None):
+        if datefmt is None:
+            return super().formatTime(record, datefmt)
+
+        second = int(record.created)
+        cached_second, cached_timestamp = self._last_timestamp
+        if second != cached_second:
+            cached_timestamp = super().formatTime(record, datefmt)
+            self._last_timestamp = (second, cached_timestamp)
+        return cached_timestamp
+
     def format(self, record):
         levelname = record.levelname
         color = self.COLORS.get(levelname, self.RESET)
@@ -50,10 +65,14 @@ def setup_logging(log_dir: str = "logs", log_level: str = "INFO"):
 
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
+        handler.close()
 
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(logging.INFO)
-    console_formatter = ColoredFormatter(datefmt=date_format)
+    if sys.stdout.isatty():
+        console_formatter = ColoredFormatter(datefmt=date_format)
+    else:
+        console_formatter = logging.Formatter(file_format, date_format)
     console_handler.setFormatter(console_formatter)
 
     file_handler = RotatingFileHandler(
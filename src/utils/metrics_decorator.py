@@ -14,16 +14,16 @@ logger = logging.getLogger(__name__)
 
 def track_request(request_type: str, service: str = None):
     def decorator(func: Callable) -> Callable:
+        metrics = get_metrics()
+        throttle = get_throttle_manager()
+
         @functools.wraps(func)
         async def wrapper(
             update: Update, context: ContextTypes.DEFAULT_TYPE, *args: Any, **kwargs: Any
         ) -> Any:
-            metrics = get_metrics()
-            throttle = get_throttle_manager()
-
             await throttle.acquire(request_type)
 
-            start_time = time.time()
+            start_time = time.perf_counter()
             success = False
             error_msg = None
 
@@ -34,11 +34,11 @@ def track_request(request_type: str, service: str = None):
 
             except Exception as e:
                 error_msg = str(e)
-                logger.error(f"Error in {func.__name__}: {e}", exc_info=True)
+                logger.error("Error in %s: %s", func.__name__, e, exc_info=True)
                 raise
 
             finally:
-                duration = time.time() - start_time
+                duration = time.perf_counter() - start_time
 
                 metrics.record_request(request_type, duration, success)
 
@@ -52,11 +52,11 @@ def track_request(request_type: str, service: str = None):
 
 def track_service_call(service: str):
     def decorator(func: Callable) -> Callable:
+        metrics = get_metrics()
+
         @functools.wraps(func)
         async def wrapper(*args: Any, **kwargs: Any) -> Any:
-            metrics = get_metrics()
-
-            start_time = time.time()
+            start_time = time.perf_counter()
             success = False
             error_msg = None
 
@@ -70,7 +70,7 @@ def track_service_call(service: str):
                 raise
 
             finally:
-                duration = time.time() - start_time
+                duration = time.perf_counter() - start_time
                 metrics.record_service_call(service, success, duration, error_msg)
 
         return wrapper
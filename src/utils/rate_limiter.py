@@ -1,6 +1,6 @@
 import logging
 import time
-from collections import defaultdict
+from collections import defaultdict, deque
 
 logger = logging.getLogger(__name__)
 
@@ -9,11 +9,11 @@ class RateLimiter:
     def __init__(self, max_requests: int = 10, window_seconds: int = 60):
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        self.requests = defaultdict(list)
-        self.last_cleanup = time.time()
+        self.requests = defaultdict(lambda: deque(maxlen=self.max_requests))
+        self.last_cleanup = time.monotonic()
 
     def is_allowed(self, user_id: int) -> bool:
-        current_time = time.time()
+        current_time = time.monotonic()
 
         if current_time - self.last_cleanup > 300:
             self._cleanup_old_entries()
@@ -22,7 +22,8 @@ class RateLimiter:
         user_requests = self.requests[user_id]
 
         cutoff_time = current_time - self.window_seconds
-        user_requests[:] = [req_time for req_time in user_requests if req_time > cutoff_time]
+        while user_requests and user_requests[0] <= cutoff_time:
+            user_requests.popleft()
 
         if len(user_requests) >= self.max_requests:
             logger.warning(
@@ -34,12 +35,13 @@ class RateLimiter:
         return True
 
     def _cleanup_old_entries(self):
-        current_time = time.time()
+        current_time = time.monotonic()
         cutoff_time = current_time - self.window_seconds
 
         users_to_remove = []
         for user_id, requests in self.requests.items():
-            requests[:] = [req_time for req_time in requests if req_time > cutoff_time]
+            while requests and requests[0] <= cutoff_time:
+                requests.popleft()
             if not requests:
                 users_to_remove.append(user_id)
 
@@ -1,6 +1,8 @@
 import sys
 from datetime import datetime
 from pathlib import Path
+from types import MappingProxyType
+from unittest.mock import AsyncMock
 
 import pytest
 
@@ -10,7 +12,7 @@ from src.models.category import TransactionType
 from src.models.transaction import Transaction
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_transaction():
     return Transaction(
         type=TransactionType.EXPENSE,
@@ -21,7 +23,17 @@ def sample_transaction():
     )
 
 
+@pytest.fixture(scope="session")
+def sample_row(sample_transaction):
+    return tuple(sample_transaction.to_sheets_row())
+
+
 @pytest.fixture
+def mutable_sample_transaction(sample_transaction):
+    return sample_transaction.model_copy()
+
+
+@pytest.fixture(scope="session")
 def sample_income_transaction():
     return Transaction(
         type=TransactionType.INCOME,
@@ -32,9 +44,9 @@ def sample_income_transaction():
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_summary():
-    return {
+    summary = {
         "income": 100000,
         "expenses": 45000,
         "balance": 55000,
@@ -46,11 +58,13 @@ def sample_summary():
             "Прочее": 5000,
         },
     }
+    summary["by_category"] = MappingProxyType(summary["by_category"])
+    return MappingProxyType(summary)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_previous_summary():
-    return {
+    summary = {
         "income": 90000,
         "expenses": 40000,
         "balance": 50000,
@@ -62,9 +76,11 @@ def sample_previous_summary():
             "Прочее": 5000,
         },
     }
+    summary["by_category"] = MappingProxyType(summary["by_category"])
+    return MappingProxyType(summary)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_sheets_rows():
     return [
         ["Дата", "Время", "Тип", "Категория", "Описание", "Сумма", "Баланс"],
@@ -80,9 +96,9 @@ def sample_sheets_rows():
     ]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_transactions_list():
-    return [
+    transactions = [
         {
             "date": "2025-01-05",
             "type": "расход",
@@ -133,3 +149,20 @@ def sample_transactions_list():
             "amount": 1200,
         },
     ]
+    return tuple(MappingProxyType(tx) for tx in transactions)
+
+
+@pytest.fixture
+def gpt_env(monkeypatch):
+    monkeypatch.setattr("src.services.ai_analyzer.YANDEX_GPT_API_KEY", "test")
+    monkeypatch.setattr("src.services.ai_analyzer.YANDEX_GPT_FOLDER_ID", "test")
+
+
+@pytest.fixture
+def mock_gpt(monkeypatch, gpt_env):
+    def _mock(response):
+        mock = AsyncMock(return_value=response)
+        monkeypatch.setattr("src.services.ai_analyzer.call_yandex_gpt_no_stream", mock)
+        return mock
+
+    return _mock
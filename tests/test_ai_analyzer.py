@@ -1,5 +1,4 @@
 import json
-from unittest.mock import AsyncMock, patch
 
 import pytest
 
@@ -148,19 +147,20 @@ class TestGenerateFallbackPeriodReport:
 
 class TestParseTransactions:
     @pytest.mark.asyncio
-    async def test_valid_json_response(self):
-        mock_response = json.dumps(
-            [{"type": "expense", "category": "Такси", "description": "До работы", "amount": 500}]
+    async def test_valid_json_response(self, mock_gpt):
+        mock_gpt(
+            json.dumps(
+                [
+                    {
+                        "type": "expense",
+                        "category": "Такси",
+                        "description": "До работы",
+                        "amount": 500,
+                    }
+                ]
+            )
         )
-
-        with patch(
-            "src.services.ai_analyzer.call_yandex_gpt_no_stream",
-            new_callable=AsyncMock,
-            return_value=mock_response,
-        ):
-            with patch("src.services.ai_analyzer.YANDEX_GPT_API_KEY", "test"):
-                with patch("src.services.ai_analyzer.YANDEX_GPT_FOLDER_ID", "test"):
-                    result = await parse_transactions("такси 500")
+        result = await parse_transactions("такси 500")
 
         assert result is not None
         assert len(result) == 1
@@ -168,77 +168,53 @@ class TestParseTransactions:
         assert result[0]["amount"] == 500
 
     @pytest.mark.asyncio
-    async def test_markdown_wrapped_json(self):
-        mock_response = '```json\n[{"type": "expense", "category": "Еда", "description": "Обед", "amount": 400}]\n```'
-
-        with patch(
-            "src.services.ai_analyzer.call_yandex_gpt_no_stream",
-            new_callable=AsyncMock,
-            return_value=mock_response,
-        ):
-            with patch("src.services.ai_analyzer.YANDEX_GPT_API_KEY", "test"):
-                with patch("src.services.ai_analyzer.YANDEX_GPT_FOLDER_ID", "test"):
-                    result = await parse_transactions("обед 400")
+    async def test_markdown_wrapped_json(self, mock_gpt):
+        mock_gpt(
+            '```json\n[{"type": "expense", "category": "Еда", "description": "Обед", "amount": 400}]\n```'
+        )
+        result = await parse_transactions("обед 400")
 
         assert result is not None
         assert len(result) == 1
 
     @pytest.mark.asyncio
-    async def test_single_object_wrapped_in_list(self):
-        mock_response = json.dumps(
-            {"type": "expense", "category": "Такси", "description": "Такси", "amount": 300}
+    async def test_single_object_wrapped_in_list(self, mock_gpt):
+        mock_gpt(
+            json.dumps(
+                {"type": "expense", "category": "Такси", "description": "Такси", "amount": 300}
+            )
         )
-
-        with patch(
-            "src.services.ai_analyzer.call_yandex_gpt_no_stream",
-            new_callable=AsyncMock,
-            return_value=mock_response,
-        ):
-            with patch("src.services.ai_analyzer.YANDEX_GPT_API_KEY", "test"):
-                with patch("src.services.ai_analyzer.YANDEX_GPT_FOLDER_ID", "test"):
-                    result = await parse_transactions("такси 300")
+        result = await parse_transactions("такси 300")
 
         assert result is not None
         assert len(result) == 1
 
     @pytest.mark.asyncio
-    async def test_invalid_json_returns_none(self):
-        with patch(
-            "src.services.ai_analyzer.call_yandex_gpt_no_stream",
-            new_callable=AsyncMock,
-            return_value="not json at all",
-        ):
-            with patch("src.services.ai_analyzer.YANDEX_GPT_API_KEY", "test"):
-                with patch("src.services.ai_analyzer.YANDEX_GPT_FOLDER_ID", "test"):
-                    result = await parse_transactions("что-то")
+    async def test_invalid_json_returns_none(self, mock_gpt):
+        mock_gpt("not json at all")
+        result = await parse_transactions("что-то")
 
         assert result is None
 
     @pytest.mark.asyncio
-    async def test_multiple_transactions(self):
-        mock_response = json.dumps(
-            [
-                {"type": "expense", "category": "Такси", "description": "Такси", "amount": 500},
-                {"type": "expense", "category": "Еда", "description": "Кофе", "amount": 200},
-            ]
+    async def test_multiple_transactions(self, mock_gpt):
+        mock_gpt(
+            json.dumps(
+                [
+                    {"type": "expense", "category": "Такси", "description": "Такси", "amount": 500},
+                    {"type": "expense", "category": "Еда", "description": "Кофе", "amount": 200},
+                ]
+            )
         )
-
-        with patch(
-            "src.services.ai_analyzer.call_yandex_gpt_no_stream",
-            new_callable=AsyncMock,
-            return_value=mock_response,
-        ):
-            with patch("src.services.ai_analyzer.YANDEX_GPT_API_KEY", "test"):
-                with patch("src.services.ai_analyzer.YANDEX_GPT_FOLDER_ID", "test"):
-                    result = await parse_transactions("такси 500 кофе 200")
+        result = await parse_transactions("такси 500 кофе 200")
 
         assert result is not None
         assert len(result) == 2
 
     @pytest.mark.asyncio
-    async def test_no_api_key_returns_none(self):
-        with patch("src.services.ai_analyzer.YANDEX_GPT_API_KEY", ""):
-            with patch("src.services.ai_analyzer.YANDEX_GPT_FOLDER_ID", "test"):
-                result = await parse_transactions("такси 500")
+    async def test_no_api_key_returns_none(self, monkeypatch):
+        monkeypatch.setattr("src.services.ai_analyzer.YANDEX_GPT_API_KEY", "")
+        monkeypatch.setattr("src.services.ai_analyzer.YANDEX_GPT_FOLDER_ID", "test")
+        result = await parse_transactions("такси 500")
 
         assert result is None
@@ -1,5 +1,4 @@
-import time
-from unittest.mock import patch
+from types import SimpleNamespace
 
 import pytest
 
@@ -16,6 +15,21 @@ def breaker():
     return CircuitBreaker(failure_threshold=3, recovery_timeout=10)
 
 
+class FrozenClock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+@pytest.fixture
+def frozen_clock(monkeypatch):
+    clock = FrozenClock()
+    monkeypatch.setattr("src.utils.circuit_breaker.time", SimpleNamespace(monotonic=clock))
+    return clock
+
+
 async def success_func():
     return "ok"
 
@@ -25,45 +39,38 @@ async def failing_func():
 
 
 class TestCircuitBreakerSuccess:
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="module")
     async def test_success_keeps_closed(self, breaker):
         await breaker.call(success_func)
         assert breaker.state == CircuitState.CLOSED
         assert breaker.failure_count == 0
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="module")
     async def test_success_returns_result(self, breaker):
         result = await breaker.call(success_func)
         assert result == "ok"
 
 
 class TestCircuitBreakerFailures:
-    @pytest.mark.asyncio
-    async def test_failure_increments_count(self, breaker):
-        with pytest.raises(Exception):
-            await breaker.call(failing_func)
-        assert breaker.failure_count == 1
-        assert breaker.state == CircuitState.CLOSED
-
-    @pytest.mark.asyncio
-    async def test_failures_below_threshold_stay_closed(self, breaker):
-        for _ in range(2):
-            with pytest.raises(Exception):
-                await breaker.call(failing_func)
-        assert breaker.failure_count == 2
-        assert breaker.state == CircuitState.CLOSED
-
-    @pytest.mark.asyncio
-    async def test_threshold_failures_open_circuit(self, breaker):
-        for _ in range(3):
+    @pytest.mark.asyncio(loop_scope="module")
+    @pytest.mark.parametrize(
+        "n_failures,expected_state,expected_count",
+        [
+            pytest.param(1, CircuitState.CLOSED, 1, id="failure_increments_count"),
+            pytest.param(2, CircuitState.CLOSED, 2, id="below_threshold_stays_closed"),
+            pytest.param(3, CircuitState.OPEN, 3, id="threshold_opens_circuit"),
+        ],
+    )
+    async def test_failure_state_machine(self, breaker, n_failures, expected_state, expected_count):
+        for _ in range(n_failures):
             with pytest.raises(Exception):
                 await breaker.call(failing_func)
-        assert breaker.state == CircuitState.OPEN
-        assert breaker.failure_count == 3
+        assert breaker.state == expected_state
+        assert breaker.failure_count == expected_count
 
 
 class TestCircuitBreakerOpen:
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="module")
     async def test_open_blocks_calls(self, breaker):
         for _ in range(3):
             with pytest.raises(Exception):
@@ -72,23 +79,23 @@ class TestCircuitBreakerOpen:
         with pytest.raises(Exception, match="Circuit breaker is OPEN"):
             await breaker.call(success_func)
 
-    @pytest.mark.asyncio
-    async def test_open_transitions_to_half_open_after_timeout(self, breaker):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_open_transitions_to_half_open_after_timeout(self, breaker, frozen_clock):
         for _ in range(3):
             with pytest.raises(Exception):
                 await breaker.call(failing_func)
 
         assert breaker.state == CircuitState.OPEN
 
-        with patch("src.utils.circuit_breaker.time.time", return_value=time.time() + 11):
-            result = await breaker.call(success_func)
-            assert result == "ok"
+        frozen_clock.t = breaker.recovery_timeout + 1
+        result = await breaker.call(success_func)
+        assert result == "ok"
 
         assert breaker.state == CircuitState.CLOSED
 
 
 class TestCircuitBreakerHalfOpen:
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="module")
     async def test_success_in_half_open_closes(self, breaker):
         for _ in range(3):
             with pytest.raises(Exception):
@@ -99,7 +106,7 @@ class TestCircuitBreakerHalfOpen:
         assert breaker.state == CircuitState.CLOSED
         assert breaker.failure_count == 0
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="module")
     async def test_failure_in_half_open_reopens(self, breaker):
         breaker.state = CircuitState.HALF_OPEN
         breaker.failure_count = 2
@@ -111,7 +118,7 @@ class TestCircuitBreakerHalfOpen:
 
 
 class TestCircuitBreakerRecovery:
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="module")
     async def test_success_resets_failure_count(self, breaker):
         for _ in range(2):
             with pytest.raises(Exception):
@@ -124,29 +131,24 @@ class TestCircuitBreakerRecovery:
 
 
 class TestCircuitBreakerExpectedException:
-    @pytest.mark.asyncio
-    async def test_unexpected_exception_not_counted(self):
-        breaker = CircuitBreaker(failure_threshold=3, expected_exception=ValueError)
-
-        async def raise_type_error():
-            raise TypeError("wrong type")
-
-        with pytest.raises(TypeError):
-            await breaker.call(raise_type_error)
-
-        assert breaker.failure_count == 0
-
-    @pytest.mark.asyncio
-    async def test_expected_exception_counted(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    @pytest.mark.parametrize(
+        "raised,expected_count",
+        [
+            pytest.param(TypeError, 0, id="unexpected_not_counted"),
+            pytest.param(ValueError, 1, id="expected_counted"),
+        ],
+    )
+    async def test_expected_exception_filter(self, raised, expected_count):
         breaker = CircuitBreaker(failure_threshold=3, expected_exception=ValueError)
 
-        async def raise_value_error():
-            raise ValueError("bad value")
+        async def raise_error():
+            raise raised("x")
 
-        with pytest.raises(ValueError):
-            await breaker.call(raise_value_error)
+        with pytest.raises(raised):
+            await breaker.call(raise_error)
 
-        assert breaker.failure_count == 1
+        assert breaker.failure_count == expected_count
 
 
 class TestGlobalBreakers:
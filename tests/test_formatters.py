@@ -1,3 +1,7 @@
+from datetime import datetime
+
+import pytest
+
 from src.utils.formatters import (
     calculate_change_percent,
     format_amount,
@@ -6,106 +10,127 @@ from src.utils.formatters import (
     format_transaction_list,
     month_name,
     month_name_short,
+    parse_date,
 )
 
 
 class TestMonthName:
-    def test_january(self):
-        assert month_name(1) == "Январь"
-
-    def test_december(self):
-        assert month_name(12) == "Декабрь"
-
-    def test_invalid_month_returns_string(self):
-        assert month_name(13) == "13"
-
-    def test_zero_returns_string(self):
-        assert month_name(0) == "0"
+    @pytest.mark.parametrize(
+        "n,expected",
+        [
+            pytest.param(1, "Январь", id="january"),
+            pytest.param(12, "Декабрь", id="december"),
+            pytest.param(13, "13", id="invalid_month_returns_string"),
+            pytest.param(0, "0", id="zero_returns_string"),
+        ],
+    )
+    def test_month_name(self, n, expected):
+        assert month_name(n) == expected
 
 
 class TestMonthNameShort:
-    def test_january(self):
-        assert month_name_short(1) == "Янв"
-
-    def test_may(self):
-        assert month_name_short(5) == "Май"
-
-    def test_december(self):
-        assert month_name_short(12) == "Дек"
+    @pytest.mark.parametrize(
+        "n,expected",
+        [
+            pytest.param(1, "Янв", id="january"),
+            pytest.param(5, "Май", id="may"),
+            pytest.param(12, "Дек", id="december"),
+            pytest.param(13, "13", id="invalid_returns_string"),
+        ],
+    )
+    def test_month_name_short(self, n, expected):
+        assert month_name_short(n) == expected
 
-    def test_invalid_returns_string(self):
-        assert month_name_short(13) == "13"
 
+class TestParseDate:
+    def test_iso_date(self):
+        assert parse_date("2025-01-15") == datetime(2025, 1, 15)
 
-class TestFormatAmount:
-    def test_simple(self):
-        assert format_amount(500) == "500"
-
-    def test_thousands(self):
-        assert format_amount(1500) == "1 500"
+    def test_repeated_value_is_cached(self):
+        assert parse_date("2025-03-01") is parse_date("2025-03-01")
 
-    def test_millions(self):
-        assert format_amount(1500000) == "1 500 000"
+    def test_invalid_date_raises(self):
+        with pytest.raises(ValueError):
+            parse_date("2025-02-30")
 
-    def test_zero(self):
-        assert format_amount(0) == "0"
+    def test_wrong_format_raises(self):
+        with pytest.raises(ValueError):
+            parse_date("15.01.2025")
 
-    def test_with_sign_positive(self):
-        assert format_amount(500, with_sign=True) == "+500"
 
-    def test_with_sign_zero(self):
-        result = format_amount(0, with_sign=True)
-        assert result == "0"
-
-    def test_with_sign_negative(self):
-        assert format_amount(-500, with_sign=True) == "-500"
+class TestFormatAmount:
+    @pytest.mark.parametrize(
+        "value,kwargs,expected",
+        [
+            pytest.param(500, {}, "500", id="simple"),
+            pytest.param(1500, {}, "1 500", id="thousands"),
+            pytest.param(1500000, {}, "1 500 000", id="millions"),
+            pytest.param(0, {}, "0", id="zero"),
+            pytest.param(500, {"with_sign": True}, "+500", id="with_sign_positive"),
+            pytest.param(0, {"with_sign": True}, "0", id="with_sign_zero"),
+            pytest.param(-500, {"with_sign": True}, "-500", id="with_sign_negative"),
+            pytest.param(-1500, {}, "-1 500", id="negative_thousands"),
+            pytest.param(999.6, {}, "1 000", id="rounds_up_to_thousand"),
+        ],
+    )
+    def test_format_amount(self, value, kwargs, expected):
+        assert format_amount(value, **kwargs) == expected
 
 
 class TestCalculateChangePercent:
-    def test_increase(self):
-        assert calculate_change_percent(150, 100) == "+50.0%"
-
-    def test_decrease(self):
-        assert calculate_change_percent(80, 100) == "-20.0%"
-
-    def test_no_change(self):
-        assert calculate_change_percent(100, 100) == "+0.0%"
-
-    def test_division_by_zero(self):
-        assert calculate_change_percent(100, 0) == "—"
-
-    def test_both_zero(self):
-        assert calculate_change_percent(0, 0) == "—"
-
-    def test_double_increase(self):
-        assert calculate_change_percent(200, 100) == "+100.0%"
+    @pytest.mark.parametrize(
+        "current,previous,expected",
+        [
+            pytest.param(150, 100, "+50.0%", id="increase"),
+            pytest.param(80, 100, "-20.0%", id="decrease"),
+            pytest.param(100, 100, "+0.0%", id="no_change"),
+            pytest.param(100, 0, "—", id="division_by_zero"),
+            pytest.param(0, 0, "—", id="both_zero"),
+            pytest.param(200, 100, "+100.0%", id="double_increase"),
+        ],
+    )
+    def test_calculate_change_percent(self, current, previous, expected):
+        assert calculate_change_percent(current, previous) == expected
 
 
 class TestFormatTransactionList:
     def test_empty_list(self):
         assert format_transaction_list([]) == "Пока транзакций нет."
 
-    def test_expense_has_minus(self):
-        txs = [{"Дата": "2025-01-15", "Категория": "Еда", "Сумма": "500", "Тип": "expense"}]
-        result = format_transaction_list(txs)
-        assert "15.01" in result
-        assert "Еда" in result
-
-    def test_income_has_plus(self):
-        txs = [{"Дата": "2025-01-10", "Категория": "Доход", "Сумма": "100000", "Тип": "income"}]
-        result = format_transaction_list(txs)
-        assert "+" in result
-
-    def test_invalid_date_handled(self):
-        txs = [{"Дата": "invalid", "Категория": "Еда", "Сумма": "500", "Тип": "expense"}]
-        result = format_transaction_list(txs)
-        assert "invalid" in result
-
-    def test_empty_amount_handled(self):
-        txs = [{"Дата": "2025-01-15", "Категория": "Еда", "Сумма": "", "Тип": "expense"}]
-        result = format_transaction_list(txs)
-        assert "Еда" in result
-        assert "15.01" in result
+    @pytest.mark.parametrize(
+        "tx,substrings",
+        [
+            pytest.param(
+                {"Дата": "2025-01-15", "Категория": "Еда", "Сумма": "500", "Тип": "expense"},
+                ["15.01", "Еда"],
+                id="expense",
+            ),
+            pytest.param(
+                {"Дата": "2025-01-10", "Категория": "Доход", "Сумма": "100000", "Тип": "income"},
+                ["+"],
+                id="income_has_plus",
+            ),
+            pytest.param(
+                {"Дата": "invalid", "Категория": "Еда", "Сумма": "500", "Тип": "expense"},
+                ["invalid"],
+                id="invalid_date_handled",
+            ),
+            pytest.param(
+                {"Дата": "2025-01-15", "Категория": "Еда", "Сумма": "", "Тип": "expense"},
+                ["Еда", "15.01"],
+                id="empty_amount_handled",
+            ),
+            pytest.param(
+                {"Дата": "2025-01-15", "Категория": "Еда", "Сумма": "1\xa0500", "Тип": "expense"},
+                ["1 500"],
+                id="nbsp_in_amount",
+            ),
+        ],
+    )
+    def test_single_tx(self, tx, substrings):
+        result = format_transaction_list([tx])
+        for substring in substrings:
+            assert substring in result
 
     def test_multiple_transactions(self):
         txs = [
@@ -116,10 +141,10 @@ class TestFormatTransactionList:
         assert "Еда" in result
         assert "Такси" in result
 
-    def test_nbsp_in_amount(self):
-        txs = [{"Дата": "2025-01-15", "Категория": "Еда", "Сумма": "1\xa0500", "Тип": "expense"}]
+    def test_english_keys(self):
+        txs = [{"Date": "2025-01-15", "Category": "Food", "Amount": "500", "Type": "income"}]
         result = format_transaction_list(txs)
-        assert "1 500" in result
+        assert result == "15.01  Food  +500 ₽"
 
 
 class TestFormatReportHeader:
@@ -137,21 +162,29 @@ class TestFormatSummary:
         assert "БАЛАНС" in result
         assert "100 000" in result
 
-    def test_with_previous(self, sample_summary, sample_previous_summary):
-        result = format_summary(sample_summary, sample_previous_summary)
-        assert "%" in result
-
-    def test_without_previous(self, sample_summary):
-        result = format_summary(sample_summary)
-        assert "%" not in result
-
     def test_categories_listed(self, sample_summary):
         result = format_summary(sample_summary)
         assert "Еда" in result
         assert "Такси" in result
 
-    def test_previous_with_zero_income(self):
-        summary = {"income": 50000, "expenses": 30000, "by_category": {}}
-        previous = {"income": 0, "expenses": 20000, "by_category": {}}
-        result = format_summary(summary, previous)
-        assert "—" in result
+    @pytest.mark.parametrize(
+        "case,expect_pct,expect_dash",
+        [
+            pytest.param("previous", True, False, id="with_previous"),
+            pytest.param("none", False, False, id="without_previous"),
+            pytest.param("zero_income", True, True, id="previous_with_zero_income"),
+        ],
+    )
+    def test_format_summary_previous(
+        self, sample_summary, sample_previous_summary, case, expect_pct, expect_dash
+    ):
+        if case == "previous":
+            result = format_summary(sample_summary, sample_previous_summary)
+        elif case == "none":
+            result = format_summary(sample_summary)
+        else:
+            summary = {"income": 50000, "expenses": 30000, "by_category": {}}
+            previous = {"income": 0, "expenses": 20000, "by_category": {}}
+            result = format_summary(summary, previous)
+        assert ("%" in result) == expect_pct
+        assert ("—" in result) == expect_dash
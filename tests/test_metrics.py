@@ -1,3 +1,4 @@
+import copy
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -6,17 +7,18 @@ from src.services.metrics import MetricsCollector, RequestMetrics, ServiceStatus
 
 
 class TestServiceStatus:
-    def test_healthy_at_95_percent(self):
-        status = ServiceStatus(total_calls=20, success_calls=19, failed_calls=1)
-        assert status.is_healthy is True
-
-    def test_unhealthy_below_95_percent(self):
-        status = ServiceStatus(total_calls=20, success_calls=18, failed_calls=2)
-        assert status.is_healthy is False
-
-    def test_success_rate_mixed(self):
-        status = ServiceStatus(total_calls=10, success_calls=8, failed_calls=2)
-        assert status.success_rate == 80.0
+    @pytest.mark.parametrize(
+        "total,success,failed,healthy,rate",
+        [
+            pytest.param(20, 19, 1, True, 95.0, id="healthy_at_95_percent"),
+            pytest.param(20, 18, 2, False, 90.0, id="unhealthy_below_95_percent"),
+            pytest.param(10, 8, 2, False, 80.0, id="mixed"),
+        ],
+    )
+    def test_service_status(self, total, success, failed, healthy, rate):
+        status = ServiceStatus(total_calls=total, success_calls=success, failed_calls=failed)
+        assert status.is_healthy is healthy
+        assert status.success_rate == rate
 
 
 class TestRequestMetrics:
@@ -29,21 +31,30 @@ class TestRequestMetrics:
         assert m.success_rate == 80.0
 
 
+PERCENTILE_DATA = tuple(float(i) for i in range(100))
+
+
+@pytest.fixture(scope="module")
+def base_collector():
+    with patch("src.services.metrics.psutil.Process") as mock_process:
+        mock_proc = MagicMock()
+        mock_proc.memory_info.return_value.rss = 100 * 1024 * 1024
+        mock_proc.memory_percent.return_value = 5.0
+        mock_process.return_value = mock_proc
+        return MetricsCollector()
+
+
 class TestMetricsCollector:
     @pytest.fixture
-    def collector(self):
-        with patch("src.services.metrics.psutil.Process") as mock_process:
-            mock_proc = MagicMock()
-            mock_proc.memory_info.return_value.rss = 100 * 1024 * 1024
-            mock_proc.memory_percent.return_value = 5.0
-            mock_process.return_value = mock_proc
-            return MetricsCollector()
-
-    def test_initial_services(self, collector):
-        assert "yandex_gpt" in collector.services
-        assert "google_sheets" in collector.services
-        assert "yandex_stt" in collector.services
-        assert "telegram" in collector.services
+    def collector(self, base_collector):
+        process = base_collector._process
+        return copy.deepcopy(base_collector, {id(process): process})
+
+    def test_initial_services(self, base_collector):
+        assert "yandex_gpt" in base_collector.services
+        assert "google_sheets" in base_collector.services
+        assert "yandex_stt" in base_collector.services
+        assert "telegram" in base_collector.services
 
     def test_record_request(self, collector):
         collector.record_request("text", 0.5, success=True)
@@ -71,8 +82,8 @@ class TestMetricsCollector:
         collector.record_service_call("unknown_service", True, 0.1)
         assert "unknown_service" not in collector.services
 
-    def test_overall_health_all_healthy(self, collector):
-        assert collector.get_overall_health() == "healthy"
+    def test_overall_health_all_healthy(self, base_collector):
+        assert base_collector.get_overall_health() == "healthy"
 
     def test_overall_health_one_unhealthy_degraded(self, collector):
         collector.services["yandex_gpt"].total_calls = 10
@@ -88,34 +99,33 @@ class TestMetricsCollector:
 
         assert collector.get_overall_health() == "unhealthy"
 
-    def test_response_time_percentiles_empty(self, collector):
-        result = collector.get_response_time_percentiles()
+    def test_response_time_percentiles_empty(self, base_collector):
+        result = base_collector.get_response_time_percentiles()
         assert result == {"p50": 0.0, "p95": 0.0, "p99": 0.0}
 
     def test_response_time_percentiles_with_data(self, collector):
-        for i in range(100):
-            collector.response_times.append(float(i))
+        collector.response_times.extend(PERCENTILE_DATA)
         result = collector.get_response_time_percentiles()
         assert result["p50"] == 50.0
         assert result["p95"] == 95.0
 
-    def test_uptime_positive(self, collector):
-        assert collector.get_uptime() > 0
+    def test_uptime_positive(self, base_collector):
+        assert base_collector.get_uptime() > 0
 
     def test_avg_response_time_calculation(self, collector):
         collector.record_service_call("yandex_gpt", True, 1.0)
         collector.record_service_call("yandex_gpt", True, 3.0)
         assert collector.services["yandex_gpt"].avg_response_time == 2.0
 
-    def test_metrics_summary_structure(self, collector):
-        summary = collector.get_metrics_summary()
+    def test_metrics_summary_structure(self, base_collector):
+        summary = base_collector.get_metrics_summary()
         assert "status" in summary
         assert "uptime_seconds" in summary
         assert "requests" in summary
         assert "response_times" in summary
 
-    def test_services_status_structure(self, collector):
-        status = collector.get_services_status()
+    def test_services_status_structure(self, base_collector):
+        status = base_collector.get_services_status()
         for name, data in status.items():
             assert "healthy" in data
             assert "total_calls" in data
@@ -13,6 +13,8 @@ from src.models.category import (
 )
 from src.models.transaction import Transaction
 
+BASE_TX_KWARGS = {"type": TransactionType.EXPENSE, "category": "Еда", "description": "Обед"}
+
 
 class TestTransaction:
     def test_create_valid_expense(self):
@@ -36,23 +38,13 @@ class TestTransaction:
         )
         assert tx.type == TransactionType.INCOME
 
-    def test_zero_amount_raises(self):
-        with pytest.raises(ValidationError):
-            Transaction(
-                type=TransactionType.EXPENSE,
-                category="Еда",
-                description="Обед",
-                amount=0,
-            )
-
-    def test_negative_amount_raises(self):
+    @pytest.mark.parametrize("amount", [0, 0.0, -0.01, -1, -100])
+    def test_invalid_amount_raises(self, amount):
         with pytest.raises(ValidationError):
-            Transaction(
-                type=TransactionType.EXPENSE,
-                category="Еда",
-                description="Обед",
-                amount=-100,
-            )
+            Transaction(**BASE_TX_KWARGS, amount=amount)
+
+    def test_smallest_positive_amount_is_valid(self):
+        assert Transaction(**BASE_TX_KWARGS, amount=0.01).amount == 0.01
 
     def test_default_date_is_set(self):
         tx = Transaction(
@@ -65,54 +57,35 @@ class TestTransaction:
 
 
 class TestToSheetsRow:
-    def test_row_length(self, sample_transaction):
-        row = sample_transaction.to_sheets_row()
-        assert len(row) == 12
-
-    def test_date_format(self, sample_transaction):
-        row = sample_transaction.to_sheets_row()
-        assert row[0] == "2025-01-15"
-
-    def test_time_format(self, sample_transaction):
-        row = sample_transaction.to_sheets_row()
-        assert row[1] == "12:30"
-
-    def test_tx_id_none_becomes_empty(self, sample_transaction):
-        row = sample_transaction.to_sheets_row()
-        assert row[2] == ""
-
-    def test_tx_id_present(self, sample_transaction):
-        sample_transaction.tx_id = 42
-        row = sample_transaction.to_sheets_row()
+    def test_row_length(self, sample_row):
+        assert len(sample_row) == 12
+
+    @pytest.mark.parametrize(
+        "idx,expected",
+        [
+            pytest.param(0, "2025-01-15", id="date_format"),
+            pytest.param(1, "12:30", id="time_format"),
+            pytest.param(2, "", id="tx_id_none_becomes_empty"),
+            pytest.param(3, "expense", id="type_value"),
+            pytest.param(4, "Еда", id="category"),
+            pytest.param(5, "Обед в столовой", id="description"),
+            pytest.param(6, 500.0, id="amount"),
+            pytest.param(8, 2025, id="year"),
+            pytest.param(9, 1, id="month"),
+            pytest.param(10, "Нет", id="not_confirmed"),
+        ],
+    )
+    def test_row_field(self, sample_row, idx, expected):
+        assert sample_row[idx] == expected
+
+    def test_tx_id_present(self, mutable_sample_transaction):
+        mutable_sample_transaction.tx_id = 42
+        row = mutable_sample_transaction.to_sheets_row()
         assert row[2] == 42
 
-    def test_type_value(self, sample_transaction):
-        row = sample_transaction.to_sheets_row()
-        assert row[3] == "expense"
-
-    def test_category(self, sample_transaction):
-        row = sample_transaction.to_sheets_row()
-        assert row[4] == "Еда"
-
-    def test_description(self, sample_transaction):
-        row = sample_transaction.to_sheets_row()
-        assert row[5] == "Обед в столовой"
-
-    def test_amount(self, sample_transaction):
-        row = sample_transaction.to_sheets_row()
-        assert row[6] == 500.0
-
-    def test_year_and_month(self, sample_transaction):
-        row = sample_transaction.to_sheets_row()
-        assert row[8] == 2025
-        assert row[9] == 1
-
-    def test_confirmed_field(self, sample_transaction):
-        row = sample_transaction.to_sheets_row()
-        assert row[10] == "Нет"
-
-        sample_transaction.confirmed = True
-        row = sample_transaction.to_sheets_row()
+    def test_confirmed_field(self, mutable_sample_transaction):
+        mutable_sample_transaction.confirmed = True
+        row = mutable_sample_transaction.to_sheets_row()
         assert row[10] == "Да"
 
 
@@ -131,24 +104,25 @@ class TestToSheetsRowIncome:
 
 
 class TestFormatForUser:
-    def test_expense_format(self, sample_transaction):
-        result = sample_transaction.format_for_user()
-        assert "Обед в столовой" in result
-        assert "Еда" in result
-        assert "-500" in result
-
-    def test_income_format(self, sample_income_transaction):
-        result = sample_income_transaction.format_for_user()
-        assert "Зарплата за январь" in result
-        assert "+100" in result
-
-    def test_expense_has_minus_sign(self, sample_transaction):
-        result = sample_transaction.format_for_user()
-        assert "Сумма: -" in result
-
-    def test_income_has_plus_sign(self, sample_income_transaction):
-        result = sample_income_transaction.format_for_user()
-        assert "Сумма: +" in result
+    @pytest.mark.parametrize(
+        "tx_fixture,substrings",
+        [
+            pytest.param(
+                "sample_transaction",
+                ["Обед в столовой", "Еда", "-500", "Сумма: -"],
+                id="expense",
+            ),
+            pytest.param(
+                "sample_income_transaction",
+                ["Зарплата за январь", "+100", "Сумма: +"],
+                id="income",
+            ),
+        ],
+    )
+    def test_format_for_user(self, request, tx_fixture, substrings):
+        result = request.getfixturevalue(tx_fixture).format_for_user()
+        for substring in substrings:
+            assert substring in result
 
 
 class TestCategory:
@@ -166,31 +140,38 @@ class TestCategory:
     def test_all_categories_includes_all(self):
         assert len(ALL_CATEGORIES) == len(EXPENSE_CATEGORIES) + 1
 
-    def test_get_category_by_code_found(self):
-        cat = get_category_by_code("food")
-        assert cat is not None
-        assert cat.name == "Еда"
-        assert cat.type == TransactionType.EXPENSE
-
-    def test_get_category_by_code_income(self):
-        cat = get_category_by_code("income")
-        assert cat is not None
-        assert cat.name == "Доход"
-
-    def test_get_category_by_code_not_found(self):
-        assert get_category_by_code("nonexistent") is None
-
-    def test_get_categories_by_type_expense(self):
-        cats = get_categories_by_type(TransactionType.EXPENSE)
-        assert len(cats) == len(EXPENSE_CATEGORIES)
-        assert all(c.type == TransactionType.EXPENSE for c in cats)
-
-    def test_get_categories_by_type_income(self):
-        cats = get_categories_by_type(TransactionType.INCOME)
-        assert len(cats) == 1
-        assert cats[0].code == "income"
-
-    def test_each_category_has_keywords(self):
-        for cat in EXPENSE_CATEGORIES:
-            if cat.code != "other":
-                assert len(cat.keywords) > 0, f"Category {cat.code} has no keywords"
+    @pytest.mark.parametrize(
+        "code,expected_name,expected_type",
+        [
+            pytest.param("food", "Еда", TransactionType.EXPENSE, id="found"),
+            pytest.param("income", "Доход", TransactionType.INCOME, id="income"),
+            pytest.param("nonexistent", None, None, id="not_found"),
+        ],
+    )
+    def test_get_category_by_code(self, code, expected_name, expected_type):
+        cat = get_category_by_code(code)
+        if expected_name is None:
+            assert cat is None
+        else:
+            assert cat.name == expected_name
+            assert cat.type == expected_type
+
+    @pytest.mark.parametrize(
+        "tx_type,expected_count",
+        [
+            pytest.param(TransactionType.EXPENSE, len(EXPENSE_CATEGORIES), id="expense"),
+            pytest.param(TransactionType.INCOME, 1, id="income"),
+        ],
+    )
+    def test_get_categories_by_type(self, tx_type, expected_count):
+        cats = get_categories_by_type(tx_type)
+        assert len(cats) == expected_count
+        assert all(c.type == tx_type for c in cats)
+
+    @pytest.mark.parametrize(
+        "cat",
+        [c for c in EXPENSE_CATEGORIES if c.code != "other"],
+        ids=lambda c: c.code,
+    )
+    def test_category_has_keywords(self, cat):
+        assert len(cat.keywords) > 0
@@ -0,0 +1,40 @@
+import time
+from unittest.mock import patch
+
+from src.utils.rate_limiter import RateLimiter
+
+
+class TestRateLimiter:
+    def test_allows_within_limit(self):
+        limiter = RateLimiter(max_requests=3, window_seconds=60)
+        assert all(limiter.is_allowed(1) for _ in range(3))
+
+    def test_blocks_over_limit(self):
+        limiter = RateLimiter(max_requests=3, window_seconds=60)
+        for _ in range(3):
+            limiter.is_allowed(1)
+        assert limiter.is_allowed(1) is False
+
+    def test_users_are_independent(self):
+        limiter = RateLimiter(max_requests=1, window_seconds=60)
+        assert limiter.is_allowed(1) is True
+        assert limiter.is_allowed(2) is True
+        assert limiter.is_allowed(1) is False
+
+    def test_window_expires(self):
+        limiter = RateLimiter(max_requests=2, window_seconds=60)
+        for _ in range(2):
+            limiter.is_allowed(1)
+
+        with patch("src.utils.rate_limiter.time.monotonic", return_value=time.monotonic() + 61):
+            assert limiter.is_allowed(1) is True
+
+    def test_cleanup_drops_inactive_users(self):
+        limiter = RateLimiter(max_requests=2, window_seconds=60)
+        limiter.is_allowed(1)
+
+        with patch("src.utils.rate_limiter.time.monotonic", return_value=time.monotonic() + 301):
+            limiter.is_allowed(2)
+
+        assert 1 not in limiter.requests
+        assert 2 in limiter.requests
@@ -1,19 +1,67 @@
+import asyncio
+import csv
+import io
 from datetime import datetime
 from unittest.mock import MagicMock, patch
 
+import gspread
+import pytest
+
 from src.services.sheets import (
     _analyze_categories,
     _analyze_comparison,
     _analyze_patterns,
+    _build_frame,
+    _fetch_transaction_rows,
+    _invalidate_transactions,
+    _scan_expenses,
+    _summarize_frame,
+    _values_cache,
+    _with_retry,
+    _worksheets,
+    add_transaction,
+    add_transactions,
+    build_month_report,
     calculate_month_summary,
+    close_sheets_session,
+    export_to_csv,
+    get_last_balance,
+    get_month_transactions_markdown,
     get_period_summary,
+    get_spreadsheet,
+    get_transactions,
     get_yearly_monthly_breakdown,
+    init_spreadsheet,
+    reset_spreadsheet,
+    warm_up,
 )
 
 
+@pytest.fixture(autouse=True)
+def reset_caches():
+    _invalidate_transactions()
+    _worksheets.clear()
+    _values_cache.clear()
+    yield
+    _invalidate_transactions()
+    _worksheets.clear()
+    _values_cache.clear()
+
+
+def unformatted(cell):
+    try:
+        return int(cell)
+    except (TypeError, ValueError):
+        try:
+            return float(cell)
+        except (TypeError, ValueError):
+            return cell
+
+
 def make_mock_spreadsheet(rows):
     mock_worksheet = MagicMock()
     mock_worksheet.get_all_values.return_value = rows
+    mock_worksheet.get.return_value = [[unformatted(cell) for cell in row] for row in rows[1:]]
 
     mock_spreadsheet = MagicMock()
     mock_spreadsheet.worksheet.return_value = mock_worksheet
@@ -21,6 +69,31 @@ def make_mock_spreadsheet(rows):
     return mock_spreadsheet
 
 
+class StubSpreadsheet:
+    __slots__ = ("rows", "data_rows")
+    title = "Транзакции"
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.data_rows = [[unformatted(cell) for cell in row] for row in rows[1:]]
+
+    def worksheet(self, *args, **kwargs):
+        return self
+
+    def get(self, *args, **kwargs):
+        return self.data_rows
+
+    def get_all_values(self):
+        return self.rows
+
+
+def make_api_error(status):
+    response = MagicMock()
+    response.status_code = status
+    response.json.return_value = {"error": {"code": status, "message": "error", "status": ""}}
+    return gspread.exceptions.APIError(response)
+
+
 class TestAnalyzeCategories:
     def test_basic_stats(self, sample_transactions_list):
         by_category = {"Еда": 8600, "Такси": 500, "Развлечения": 800, "Здоровье": 1200}
@@ -146,6 +219,56 @@ class TestAnalyzeCategories:
         assert food["weekend_amount"] == 2000
 
 
+class TestScanExpenses:
+    def test_vectorized_matches_loop(self, monkeypatch):
+        categories = ["Еда", "Такси", "Кафе"]
+        transactions = [
+            {
+                "date": f"2025-01-{i % 28 + 1:02d}" if i % 17 else "2025-02-30",
+                "type": "доход" if i % 5 == 0 else "расход",
+                "category": categories[i % 3],
+                "description": f"Покупка {i % 4}",
+                "amount": (i * 37) % 900 + 100,
+            }
+            for i in range(200)
+        ]
+
+        vectorized = _scan_expenses(transactions)
+        monkeypatch.setattr("src.services.sheets.VECTORIZE_MIN_EXPENSES", len(transactions) + 1)
+        loop = _scan_expenses(transactions)
+
+        assert vectorized["categories"] == dict(loop["categories"])
+        assert vectorized["day_totals"] == loop["day_totals"]
+        assert vectorized["description_totals"] == loop["description_totals"]
+        assert vectorized["description_counts"] == loop["description_counts"]
+        assert vectorized["avg_amount"] == pytest.approx(loop["avg_amount"])
+        assert vectorized["std_amount"] == pytest.approx(loop["std_amount"])
+
+    def test_max_transaction_keeps_first_of_equal_amounts(self):
+        transactions = [
+            {"date": "2025-01-05", "type": "расход", "category": "Еда", "amount": 100}
+            for _ in range(70)
+        ]
+        transactions[10] = dict(transactions[10], amount=500, description="первый")
+        transactions[20] = dict(transactions[20], amount=500, description="второй")
+
+        scan = _scan_expenses(transactions)
+
+        assert scan["categories"]["Еда"]["max_tx"]["description"] == "первый"
+
+    @pytest.mark.parametrize("count", [3, 70], ids=["loop", "vectorized"])
+    def test_numeric_description_from_sheet(self, count):
+        frame = _build_frame([["2025-01-05", "", "расход", "Еда", 123, 500]] * count)
+        transactions = frame[["date", "type", "category", "description", "amount"]].to_dict(
+            "records"
+        )
+
+        scan = _scan_expenses(transactions)
+
+        assert scan["description_totals"] == {"123": 500 * count}
+        assert scan["categories"]["Еда"]["count"] == count
+
+
 class TestAnalyzePatterns:
     def test_empty_transactions(self):
         result = _analyze_patterns([])
@@ -302,6 +425,26 @@ class TestAnalyzePatterns:
         result = _analyze_patterns(transactions)
         assert len(result["anomalies"]) <= 5
 
+    def test_anomalies_keep_order_of_equal_amounts(self):
+        transactions = [
+            {"date": "2025-01-05", "type": "расход", "category": "Еда", "amount": 100}
+            for _ in range(60)
+        ]
+        for description, amount in zip("abcdefg", [5000, 6000, 5000, 7000, 5000, 6000, 5000]):
+            transactions.append(
+                {
+                    "date": "2025-01-06",
+                    "type": "расход",
+                    "category": "Техника",
+                    "description": description,
+                    "amount": amount,
+                }
+            )
+
+        result = _analyze_patterns(transactions)
+
+        assert [a["description"] for a in result["anomalies"]] == ["d", "b", "f", "a", "c"]
+
 
 class TestAnalyzeComparison:
     def test_expenses_growth(self):
@@ -377,8 +520,8 @@ class TestAnalyzeComparison:
 
 class TestCalculateMonthSummary:
     def test_filters_by_month(self, sample_sheets_rows):
-        mock_ss = make_mock_spreadsheet(sample_sheets_rows)
-        with patch("src.services.sheets.get_spreadsheet", return_value=mock_ss):
+        spreadsheet = StubSpreadsheet(sample_sheets_rows)
+        with patch("src.services.sheets.get_spreadsheet", return_value=spreadsheet):
             result = calculate_month_summary(2025, 1)
 
         assert result["income"] == 100000
@@ -386,8 +529,8 @@ class TestCalculateMonthSummary:
         assert "Еда" in result["by_category"]
 
     def test_different_month(self, sample_sheets_rows):
-        mock_ss = make_mock_spreadsheet(sample_sheets_rows)
-        with patch("src.services.sheets.get_spreadsheet", return_value=mock_ss):
+        spreadsheet = StubSpreadsheet(sample_sheets_rows)
+        with patch("src.services.sheets.get_spreadsheet", return_value=spreadsheet):
             result = calculate_month_summary(2025, 2)
 
         assert result["income"] == 30000
@@ -395,8 +538,8 @@ class TestCalculateMonthSummary:
 
     def test_empty_sheet(self):
         rows = [["Дата", "Время", "Тип", "Категория", "Описание", "Сумма", "Баланс"]]
-        mock_ss = make_mock_spreadsheet(rows)
-        with patch("src.services.sheets.get_spreadsheet", return_value=mock_ss):
+        spreadsheet = StubSpreadsheet(rows)
+        with patch("src.services.sheets.get_spreadsheet", return_value=spreadsheet):
             result = calculate_month_summary(2025, 1)
 
         assert result == {"income": 0, "expenses": 0, "balance": 0, "by_category": {}}
@@ -408,24 +551,39 @@ class TestCalculateMonthSummary:
             ["invalid", "", "", "", "", "", ""],
             ["2025-01-06", "10:00", "расход", "Такси", "Такси", "not_a_number", ""],
         ]
-        mock_ss = make_mock_spreadsheet(rows)
-        with patch("src.services.sheets.get_spreadsheet", return_value=mock_ss):
+        spreadsheet = StubSpreadsheet(rows)
+        with patch("src.services.sheets.get_spreadsheet", return_value=spreadsheet):
             result = calculate_month_summary(2025, 1)
 
         assert result["expenses"] == 500
 
     def test_balance_calculation(self, sample_sheets_rows):
-        mock_ss = make_mock_spreadsheet(sample_sheets_rows)
-        with patch("src.services.sheets.get_spreadsheet", return_value=mock_ss):
+        spreadsheet = StubSpreadsheet(sample_sheets_rows)
+        with patch("src.services.sheets.get_spreadsheet", return_value=spreadsheet):
             result = calculate_month_summary(2025, 1)
 
         assert result["balance"] == result["income"] - result["expenses"]
 
+    def test_month_without_transactions(self, sample_sheets_rows):
+        result = calculate_month_summary(2024, 12, rows=sample_sheets_rows[1:])
+
+        assert result == {"income": 0.0, "expenses": 0.0, "balance": 0.0, "by_category": {}}
+
+    def test_interleaved_months(self):
+        rows = [
+            ["2025-01-05", "10:00", "расход", "Еда", "Обед", 500, ""],
+            ["2025-02-01", "10:00", "расход", "Еда", "Ужин", 700, ""],
+            ["2025-01-20", "10:00", "расход", "Такси", "Такси", 300, ""],
+        ]
+
+        assert calculate_month_summary(2025, 1, rows=rows)["expenses"] == 800
+        assert calculate_month_summary(2025, 2, rows=rows)["expenses"] == 700
+
 
 class TestGetPeriodSummary:
     def test_filters_by_date_range(self, sample_sheets_rows):
-        mock_ss = make_mock_spreadsheet(sample_sheets_rows)
-        with patch("src.services.sheets.get_spreadsheet", return_value=mock_ss):
+        spreadsheet = StubSpreadsheet(sample_sheets_rows)
+        with patch("src.services.sheets.get_spreadsheet", return_value=spreadsheet):
             result = get_period_summary(datetime(2025, 1, 1), datetime(2025, 1, 10))
 
         assert result["income"] == 100000
@@ -433,36 +591,65 @@ class TestGetPeriodSummary:
         assert all(d <= "2025-01-10" for d in tx_dates)
 
     def test_includes_transactions_list(self, sample_sheets_rows):
-        mock_ss = make_mock_spreadsheet(sample_sheets_rows)
-        with patch("src.services.sheets.get_spreadsheet", return_value=mock_ss):
+        spreadsheet = StubSpreadsheet(sample_sheets_rows)
+        with patch("src.services.sheets.get_spreadsheet", return_value=spreadsheet):
             result = get_period_summary(datetime(2025, 1, 1), datetime(2025, 1, 31))
 
         assert len(result["transactions"]) > 0
         assert "date" in result["transactions"][0]
         assert "amount" in result["transactions"][0]
 
+    def test_transactions_share_vocabulary_strings(self, sample_sheets_rows):
+        result = get_period_summary(
+            datetime(2025, 1, 1), datetime(2025, 1, 31), sample_sheets_rows[1:]
+        )
+
+        food = [t for t in result["transactions"] if t["category"] == "Еда"]
+        assert len(food) == 3
+        assert food[0]["category"] is food[1]["category"] is food[2]["category"]
+        assert type(food[0]["category"]) is str
+
     def test_empty_period(self, sample_sheets_rows):
-        mock_ss = make_mock_spreadsheet(sample_sheets_rows)
-        with patch("src.services.sheets.get_spreadsheet", return_value=mock_ss):
+        spreadsheet = StubSpreadsheet(sample_sheets_rows)
+        with patch("src.services.sheets.get_spreadsheet", return_value=spreadsheet):
             result = get_period_summary(datetime(2025, 6, 1), datetime(2025, 6, 30))
 
         assert result["income"] == 0
         assert result["expenses"] == 0
         assert len(result["transactions"]) == 0
 
+    def test_bounds_with_time_match_datetime_comparison(self, sample_sheets_rows):
+        spreadsheet = StubSpreadsheet(sample_sheets_rows)
+        with patch("src.services.sheets.get_spreadsheet", return_value=spreadsheet):
+            result = get_period_summary(datetime(2025, 1, 5, 12, 0), datetime(2025, 1, 7, 8, 0))
+
+        tx_dates = [t["date"] for t in result["transactions"]]
+        assert tx_dates == ["2025-01-06", "2025-01-07"]
+
+    def test_unsorted_dates_fall_back_to_mask(self):
+        rows = [
+            ["2025-01-20", "10:00", "расход", "Еда", "Ужин", 700, ""],
+            ["2025-01-05", "10:00", "расход", "Еда", "Обед", 500, ""],
+            ["2025-01-10", "10:00", "расход", "Такси", "Такси", 300, ""],
+        ]
+        result = get_period_summary(datetime(2025, 1, 1), datetime(2025, 1, 10), rows=rows)
+
+        assert [t["date"] for t in result["transactions"]] == ["2025-01-05", "2025-01-10"]
+        assert result["expenses"] == 800
+
 
 class TestGetYearlyMonthlyBreakdown:
     def test_returns_12_months(self, sample_sheets_rows):
-        mock_ss = make_mock_spreadsheet(sample_sheets_rows)
-        with patch("src.services.sheets.get_spreadsheet", return_value=mock_ss):
+        spreadsheet = StubSpreadsheet(sample_sheets_rows)
+        with patch("src.services.sheets.get_spreadsheet", return_value=spreadsheet):
             result = get_yearly_monthly_breakdown(2025)
 
         assert len(result["income"]) == 12
         assert len(result["expenses"]) == 12
 
     def test_correct_month_assignment(self, sample_sheets_rows):
-        mock_ss = make_mock_spreadsheet(sample_sheets_rows)
-        with patch("src.services.sheets.get_spreadsheet", return_value=mock_ss):
+        spreadsheet = StubSpreadsheet(sample_sheets_rows)
+        with patch("src.services.sheets.get_spreadsheet", return_value=spreadsheet):
             result = get_yearly_monthly_breakdown(2025)
 
         assert result["income"][1] == 100000
@@ -471,16 +658,451 @@ class TestGetYearlyMonthlyBreakdown:
 
     def test_empty_year(self):
         rows = [["Дата", "Время", "Тип", "Категория", "Описание", "Сумма", "Баланс"]]
-        mock_ss = make_mock_spreadsheet(rows)
-        with patch("src.services.sheets.get_spreadsheet", return_value=mock_ss):
+        spreadsheet = StubSpreadsheet(rows)
+        with patch("src.services.sheets.get_spreadsheet", return_value=spreadsheet):
             result = get_yearly_monthly_breakdown(2025)
 
         assert all(v == 0 for v in result["income"].values())
         assert all(v == 0 for v in result["expenses"].values())
 
     def test_different_year_filtered(self, sample_sheets_rows):
-        mock_ss = make_mock_spreadsheet(sample_sheets_rows)
-        with patch("src.services.sheets.get_spreadsheet", return_value=mock_ss):
+        spreadsheet = StubSpreadsheet(sample_sheets_rows)
+        with patch("src.services.sheets.get_spreadsheet", return_value=spreadsheet):
             result = get_yearly_monthly_breakdown(2024)
 
         assert all(v == 0 for v in result["income"].values())
+
+    def test_slices_one_year_of_multi_year_history(self):
+        rows = [
+            ["Дата", "Время", "Тип", "Категория", "Описание", "Сумма", "Баланс"],
+            ["2024-12-31", "10:00", "расход", "Еда", "Ужин", 400, ""],
+            ["2025-01-01", "10:00", "доход", "Доход", "Зарплата", 1000, ""],
+            ["2025-12-31", "10:00", "расход", "Еда", "Ужин", 300, ""],
+            ["2026-01-01", "10:00", "расход", "Еда", "Обед", 200, ""],
+        ]
+        spreadsheet = StubSpreadsheet(rows)
+        with patch("src.services.sheets.get_spreadsheet", return_value=spreadsheet):
+            result = get_yearly_monthly_breakdown(2025)
+
+        assert result["income"][1] == 1000
+        assert result["expenses"][12] == 300
+        assert sum(result["expenses"].values()) == 300
+
+
+class TestSummaryCache:
+    def test_same_snapshot_is_summarized_once(self, sample_sheets_rows):
+        rows = sample_sheets_rows[1:]
+        with patch("src.services.sheets._summarize_frame", wraps=_summarize_frame) as summarize:
+            first = calculate_month_summary(2025, 1, rows=rows)
+            second = calculate_month_summary(2025, 1, rows=rows)
+
+        assert summarize.call_count == 1
+        assert first == second
+
+    def test_new_snapshot_recomputes(self, sample_sheets_rows):
+        rows = sample_sheets_rows[1:]
+        calculate_month_summary(2025, 1, rows=rows)
+        extended = rows + [["2025-01-25", "10:00", "расход", "Еда", "Кофе", "400", "0"]]
+
+        result = calculate_month_summary(2025, 1, rows=extended)
+
+        assert result["by_category"]["Еда"] == 9000
+
+    def test_caller_mutation_does_not_leak(self, sample_sheets_rows):
+        rows = sample_sheets_rows[1:]
+        start, end = datetime(2025, 1, 1), datetime(2025, 1, 31)
+        first = get_period_summary(start, end, rows)
+        first["by_category"]["Еда"] = 0
+        first["transactions"].clear()
+
+        second = get_period_summary(start, end, rows)
+
+        assert second["by_category"]["Еда"] == 8600
+        assert len(second["transactions"]) == 7
+
+
+class TestExportToCsv:
+    def test_quotes_cells_with_commas(self, sample_sheets_rows):
+        rows = sample_sheets_rows + [
+            ["2025-02-10", "10:00", "расход", "Еда", "Хлеб, молоко", "300", "216100"]
+        ]
+        spreadsheet = StubSpreadsheet(rows)
+        with patch("src.services.sheets.get_spreadsheet", return_value=spreadsheet):
+            result = export_to_csv()
+
+        lines = result.splitlines()
+        assert lines[0] == "Дата,Время,Тип,Категория,Описание,Сумма,Баланс"
+        assert lines[-1] == '2025-02-10,10:00,расход,Еда,"Хлеб, молоко",300,216100'
+
+    def test_multiline_description_round_trips(self, sample_sheets_rows):
+        row = ["2025-02-10", "10:00", "расход", "Еда", 'Хлеб\nи "молоко"', "300", "216100"]
+        spreadsheet = StubSpreadsheet(sample_sheets_rows + [row])
+        with patch("src.services.sheets.get_spreadsheet", return_value=spreadsheet):
+            result = export_to_csv()
+
+        assert list(csv.reader(io.StringIO(result)))[-1] == row
+
+    def test_empty_sheet_returns_headers(self):
+        spreadsheet = StubSpreadsheet([])
+        with patch("src.services.sheets.get_spreadsheet", return_value=spreadsheet):
+            result = export_to_csv()
+
+        assert result == "Дата,Время,Тип,Категория,Описание,Сумма,Баланс\n"
+
+
+class TestGetTransactions:
+    def test_returns_newest_first(self, sample_sheets_rows):
+        spreadsheet = StubSpreadsheet(sample_sheets_rows)
+        with patch("src.services.sheets.get_spreadsheet", return_value=spreadsheet):
+            result = get_transactions(limit=2)
+
+        assert [t["Дата"] for t in result] == ["2025-02-05", "2025-02-01"]
+
+    def test_offset_past_end(self, sample_sheets_rows):
+        spreadsheet = StubSpreadsheet(sample_sheets_rows)
+        with patch("src.services.sheets.get_spreadsheet", return_value=spreadsheet):
+            tail = get_transactions(limit=5, offset=7)
+            beyond = get_transactions(limit=5, offset=20)
+
+        assert [t["Дата"] for t in tail] == ["2025-01-06", "2025-01-05"]
+        assert beyond == []
+
+
+class TestWithRetry:
+    def test_retries_on_quota_error(self):
+        func = MagicMock(side_effect=[make_api_error(429), make_api_error(503), "ok"])
+        with patch("src.services.sheets.time.sleep") as mock_sleep:
+            result = _with_retry(func, "A1")
+
+        assert result == "ok"
+        assert func.call_count == 3
+        assert mock_sleep.call_count == 2
+        func.assert_called_with("A1")
+
+    def test_does_not_retry_client_error(self):
+        func = MagicMock(side_effect=make_api_error(400))
+        with patch("src.services.sheets.time.sleep") as mock_sleep:
+            with pytest.raises(gspread.exceptions.APIError):
+                _with_retry(func)
+
+        assert func.call_count == 1
+        mock_sleep.assert_not_called()
+
+    def test_gives_up_after_max_retries(self):
+        func = MagicMock(side_effect=make_api_error(429))
+        with patch("src.services.sheets.time.sleep") as mock_sleep:
+            with pytest.raises(gspread.exceptions.APIError):
+                _with_retry(func)
+
+        assert func.call_count == 6
+        assert all(call.args[0] <= 33 for call in mock_sleep.call_args_list)
+
+
+class TestBuildMonthReport:
+    def test_reads_sheet_once(self, sample_sheets_rows):
+        mock_ss = make_mock_spreadsheet(sample_sheets_rows)
+        worksheet = mock_ss.worksheet.return_value
+        with patch("src.services.sheets.get_spreadsheet", return_value=mock_ss):
+            report = build_month_report(2025, 2)
+
+        worksheet.get.assert_called_once()
+        worksheet.get_all_values.assert_not_called()
+        assert report["summary"]["income"] == 30000
+        assert report["previous_summary"]["expenses"] == 11100
+        assert report["enriched"]["totals"]["transaction_count"] == 2
+        assert report.keys() == {"summary", "previous_summary", "enriched"}
+
+
+class TestGetMonthTransactionsMarkdown:
+    def test_formats_key_value_blocks(self, sample_sheets_rows):
+        spreadsheet = StubSpreadsheet(sample_sheets_rows)
+        with patch("src.services.sheets.get_spreadsheet", return_value=spreadsheet):
+            result = get_month_transactions_markdown(2025, 2)
+
+        assert result == (
+            "Транзакция 1:\nдата: 2025-02-01\nтип: расход\nкатегория: Еда\n"
+            "описание: Продукты\nсумма: 2500\n---\n"
+            "Транзакция 2:\nдата: 2025-02-05\nтип: доход\nкатегория: Доход\n"
+            "описание: Фриланс\nсумма: 30000"
+        )
+
+
+class TestTransactionMirror:
+    def test_reuses_loaded_rows(self, sample_sheets_rows):
+        mock_ss = make_mock_spreadsheet(sample_sheets_rows)
+        worksheet = mock_ss.worksheet.return_value
+        with patch("src.services.sheets.get_spreadsheet", return_value=mock_ss):
+            calculate_month_summary(2025, 1)
+            get_period_summary(datetime(2025, 1, 1), datetime(2025, 1, 31))
+
+        worksheet.get.assert_called_once()
+
+    def test_frame_built_once_per_snapshot(self, sample_sheets_rows):
+        spreadsheet = StubSpreadsheet(sample_sheets_rows)
+        with (
+            patch("src.services.sheets.get_spreadsheet", return_value=spreadsheet),
+            patch("src.services.sheets._build_frame", wraps=_build_frame) as build,
+        ):
+            calculate_month_summary(2025, 1)
+            calculate_month_summary(2025, 2)
+            get_period_summary(datetime(2025, 1, 1), datetime(2025, 1, 31))
+
+        build.assert_called_once()
+
+    def test_refetches_after_max_age(self, sample_sheets_rows):
+        mock_ss = make_mock_spreadsheet(sample_sheets_rows)
+        worksheet = mock_ss.worksheet.return_value
+        with (
+            patch("src.services.sheets.get_spreadsheet", return_value=mock_ss),
+            patch("src.services.sheets.MIRROR_MAX_AGE", -1),
+        ):
+            calculate_month_summary(2025, 1)
+            calculate_month_summary(2025, 1)
+
+        assert worksheet.get.call_count == 2
+
+    def test_add_transaction_writes_through(self, mutable_sample_transaction):
+        rows = [
+            ["Дата", "Время", "Тип", "Категория", "Описание", "Сумма", "Баланс"],
+            ["2025-01-05", "10:00", "доход", "Доход", "Зарплата", 1000, 1000],
+        ]
+        mock_ss = make_mock_spreadsheet(rows)
+        worksheet = mock_ss.worksheet.return_value
+        with patch("src.services.sheets.get_spreadsheet", return_value=mock_ss):
+            warm_up()
+            add_transaction(mutable_sample_transaction)
+            balance = get_last_balance()
+
+        worksheet.get.assert_called_once()
+        assert balance == 1000 - mutable_sample_transaction.amount
+
+    def test_batch_extends_mirror_in_sheet_order(self, mutable_sample_transaction):
+        rows = [
+            ["Дата", "Время", "Тип", "Категория", "Описание", "Сумма", "Баланс"],
+            ["2025-01-05", "10:00", "доход", "Доход", "Зарплата", 1000, 1000],
+        ]
+        second = mutable_sample_transaction.model_copy(update={"amount": 200.0})
+        mock_ss = make_mock_spreadsheet(rows)
+        with patch("src.services.sheets.get_spreadsheet", return_value=mock_ss):
+            warm_up()
+            before = _fetch_transaction_rows()
+            add_transactions([mutable_sample_transaction, second])
+            after = _fetch_transaction_rows()
+
+        assert after is not before
+        assert after[:1] == before
+        assert [row[6] for row in after[1:]] == [500, 300]
+
+
+class TestGetLastBalance:
+    def test_reads_summary_cell_without_snapshot(self, sample_sheets_rows):
+        mock_ss = make_mock_spreadsheet(sample_sheets_rows)
+        worksheet = mock_ss.worksheet.return_value
+        worksheet.acell.return_value.value = 216400
+        with patch("src.services.sheets.get_spreadsheet", return_value=mock_ss):
+            balance = get_last_balance()
+
+        assert balance == 216400
+        worksheet.get.assert_not_called()
+        worksheet.acell.assert_called_once()
+
+
+class TestValuesCache:
+    def test_reuses_values_within_ttl(self, sample_sheets_rows):
+        mock_ss = make_mock_spreadsheet(sample_sheets_rows)
+        worksheet = mock_ss.worksheet.return_value
+        worksheet.title = "Транзакции"
+        with patch("src.services.sheets.get_spreadsheet", return_value=mock_ss):
+            get_transactions(limit=2)
+            export_to_csv()
+
+        worksheet.get_all_values.assert_called_once()
+
+    def test_write_invalidates_values(self, sample_sheets_rows, mutable_sample_transaction):
+        mock_ss = make_mock_spreadsheet(sample_sheets_rows)
+        worksheet = mock_ss.worksheet.return_value
+        worksheet.title = "Транзакции"
+        with patch("src.services.sheets.get_spreadsheet", return_value=mock_ss):
+            get_transactions(limit=2)
+            add_transaction(mutable_sample_transaction)
+            get_transactions(limit=2)
+
+        assert worksheet.get_all_values.call_count == 2
+
+
+class TestWorksheetCache:
+    def test_worksheet_looked_up_once(self, sample_sheets_rows):
+        mock_ss = make_mock_spreadsheet(sample_sheets_rows)
+        with patch("src.services.sheets.get_spreadsheet", return_value=mock_ss):
+            get_transactions(limit=2)
+            export_to_csv()
+
+        mock_ss.worksheet.assert_called_once_with("Транзакции")
+
+
+class TestResetSpreadsheet:
+    def test_deletes_known_sheets_in_one_batch(self):
+        mock_ss = MagicMock()
+        mock_ss.fetch_sheet_metadata.return_value = {
+            "sheets": [
+                {"properties": {"sheetId": 1, "title": "Транзакции"}},
+                {"properties": {"sheetId": 2, "title": "Сводка"}},
+                {"properties": {"sheetId": 3, "title": "Мой лист"}},
+            ]
+        }
+        with (
+            patch("src.services.sheets.get_spreadsheet", return_value=mock_ss),
+            patch("src.services.sheets.init_spreadsheet") as init,
+        ):
+            reset_spreadsheet()
+
+        mock_ss.batch_update.assert_called_once_with(
+            {"requests": [{"deleteSheet": {"sheetId": 1}}, {"deleteSheet": {"sheetId": 2}}]}
+        )
+        mock_ss.del_worksheet.assert_not_called()
+        init.assert_called_once()
+
+
+class TestCloseSheetsSession:
+    def test_closes_pool_and_reconnects_lazily(self):
+        first_client = MagicMock()
+        second_client = MagicMock()
+        with (
+            patch("src.services.sheets.GOOGLE_SHEETS_SPREADSHEET_ID", "sheet-id"),
+            patch("src.services.sheets._client", first_client),
+        ):
+            get_spreadsheet()
+            close_sheets_session()
+            with patch("src.services.sheets.get_client", return_value=second_client):
+                get_spreadsheet()
+            close_sheets_session()
+
+        first_client.http_client.session.close.assert_called_once()
+        second_client.open_by_key.assert_called_once_with("sheet-id")
+
+    def test_client_without_http_client(self):
+        client = MagicMock(spec=["open_by_key"])
+        with (
+            patch("src.services.sheets.GOOGLE_SHEETS_SPREADSHEET_ID", "sheet-id"),
+            patch("src.services.sheets._client", client),
+        ):
+            close_sheets_session()
+            with patch("src.services.sheets.get_client", return_value=client):
+                get_spreadsheet()
+            close_sheets_session()
+
+        assert client.open_by_key.call_count == 1
+
+
+class TestAddTransactions:
+    def test_appends_batch_in_one_call(self, sample_sheets_rows, mutable_sample_transaction):
+        second = mutable_sample_transaction.model_copy()
+        mock_ss = make_mock_spreadsheet(sample_sheets_rows)
+        worksheet = mock_ss.worksheet.return_value
+        with patch("src.services.sheets.get_spreadsheet", return_value=mock_ss):
+            tx_ids = add_transactions([mutable_sample_transaction, second])
+
+        assert tx_ids == [10, 11]
+        worksheet.append_rows.assert_called_once()
+        worksheet.get_all_values.assert_called_once()
+        rows = worksheet.append_rows.call_args.args[0]
+        assert "G10" in rows[0][6]
+        assert "G11" in rows[1][6]
+
+    def test_tracks_next_row_without_rereading(
+        self, sample_sheets_rows, mutable_sample_transaction
+    ):
+        mock_ss = make_mock_spreadsheet(sample_sheets_rows)
+        worksheet = mock_ss.worksheet.return_value
+        worksheet.append_rows.side_effect = [
+            {"updates": {"updatedRange": "'Транзакции'!A11:G11"}},
+            {"updates": {"updatedRange": "'Транзакции'!A12:G12"}},
+        ]
+        with patch("src.services.sheets.get_spreadsheet", return_value=mock_ss):
+            first = add_transaction(mutable_sample_transaction)
+            second = add_transaction(mutable_sample_transaction.model_copy())
+
+        assert (first, second) == (10, 11)
+        worksheet.get_all_values.assert_called_once()
+        worksheet.update.assert_not_called()
+
+    def test_fixes_formulas_when_rows_land_elsewhere(
+        self, sample_sheets_rows, mutable_sample_transaction
+    ):
+        mock_ss = make_mock_spreadsheet(sample_sheets_rows)
+        worksheet = mock_ss.worksheet.return_value
+        worksheet.append_rows.return_value = {"updates": {"updatedRange": "'Транзакции'!A13:G13"}}
+        with patch("src.services.sheets.get_spreadsheet", return_value=mock_ss):
+            tx_id = add_transaction(mutable_sample_transaction)
+
+        assert tx_id == 12
+        update_kwargs = worksheet.update.call_args.kwargs
+        assert update_kwargs["range_name"] == "G13:G13"
+        assert "G12" in update_kwargs["values"][0][0]
+
+
+class TestWriteQueue:
+    @pytest.mark.asyncio
+    async def test_coalesces_concurrent_writes(self, mutable_sample_transaction):
+        from src.services import sheets_async
+
+        calls = []
+
+        def fake_add_transactions(transactions):
+            calls.append(len(transactions))
+            return list(range(1, len(transactions) + 1))
+
+        with patch("src.services.sheets.add_transactions", side_effect=fake_add_transactions):
+            results = await asyncio.gather(
+                *(sheets_async.async_add_transaction(mutable_sample_transaction) for _ in range(3))
+            )
+            await sheets_async.stop_write_queue()
+
+        assert sorted(results) == [1, 2, 3]
+        assert sum(calls) == 3
+        assert len(calls) < 3
+
+    @pytest.mark.asyncio
+    async def test_propagates_write_error(self, mutable_sample_transaction):
+        from src.services import sheets_async
+
+        with patch("src.services.sheets.add_transactions", side_effect=RuntimeError("quota")):
+            with pytest.raises(RuntimeError, match="quota"):
+                await sheets_async.async_add_transaction(mutable_sample_transaction)
+            await sheets_async.stop_write_queue()
+
+
+class TestInitSpreadsheet:
+    def test_formats_new_sheets_in_one_batch_each(self):
+        mock_ss = make_mock_spreadsheet([])
+        worksheet = mock_ss.worksheet.return_value
+        worksheet.id = 7
+        mock_ss.values_batch_get.return_value = {"valueRanges": [{}, {}]}
+        with patch("src.services.sheets.get_spreadsheet", return_value=mock_ss):
+            init_spreadsheet()
+
+        mock_ss.values_batch_get.assert_called_once()
+        worksheet.get_all_values.assert_not_called()
+        assert mock_ss.batch_update.call_count == 2
+        worksheet.format.assert_not_called()
+        summary_requests = mock_ss.batch_update.call_args.args[0]["requests"]
+        repeat = summary_requests[0]["repeatCell"]
+        assert repeat["range"]["sheetId"] == 7
+        assert repeat["fields"] == "userEnteredFormat(backgroundColor,textFormat,borders)"
+
+    def test_seeds_mirror_from_batch_read(self, sample_sheets_rows):
+        mock_ss = make_mock_spreadsheet(sample_sheets_rows)
+        worksheet = mock_ss.worksheet.return_value
+        mock_ss.values_batch_get.return_value = {
+            "valueRanges": [
+                {"values": [[unformatted(c) for c in row] for row in sample_sheets_rows]},
+                {"values": [["НАСТРОЙКИ", ""], ["Начальный баланс", 0]]},
+            ]
+        }
+        with patch("src.services.sheets.get_spreadsheet", return_value=mock_ss):
+            init_spreadsheet()
+            summary = calculate_month_summary(2025, 2)
+
+        worksheet.get.assert_not_called()
+        mock_ss.batch_update.assert_not_called()
+        assert summary["income"] == 30000
@@ -1,5 +1,6 @@
 from src.bot.handlers.text import (
     clean_description,
+    clear_category_cache,
     determine_type_and_category,
     parse_amount,
     parse_amount_from_part,
@@ -166,6 +167,12 @@ class TestDetermineTypeAndCategory:
         tx_type, _ = determine_type_and_category("получил подарок 3000")
         assert tx_type == TransactionType.INCOME
 
+    def test_normalized_text_is_cached(self):
+        clear_category_cache()
+        first = determine_type_and_category("Такси до дома")
+        second = determine_type_and_category("  такси до дома ")
+        assert second is first
+
 
 class TestCleanDescription:
     def test_removes_amount(self):
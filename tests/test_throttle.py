@@ -1,3 +1,6 @@
+import asyncio
+import time
+
 import pytest
 
 from src.services.throttle import RateLimiter, ThrottleConfig, ThrottleManager
@@ -62,6 +65,18 @@ class TestThrottleManager:
         restored_rate = manager.rate_limiters["text"].config.max_requests_per_second
         assert restored_rate == normal_rate
 
+    @pytest.mark.asyncio
+    async def test_degraded_mode_keeps_request_history(self, manager):
+        limiter = manager.rate_limiters["text"]
+        await manager.acquire("text", wait=False)
+        await manager.acquire("text", wait=False)
+
+        manager.enable_degraded_mode()
+
+        assert manager.rate_limiters["text"] is limiter
+        assert limiter.second_level == pytest.approx(2.0, abs=0.01)
+        assert await manager.acquire("text", wait=False) is False
+
 
 class TestRateLimiter:
     @pytest.mark.asyncio
@@ -92,3 +107,40 @@ class TestRateLimiter:
 
         result = await limiter.acquire(wait=False)
         assert result is False
+
+    @pytest.mark.asyncio
+    async def test_expired_requests_do_not_count(self, strict_config):
+        limiter = RateLimiter(strict_config)
+        limiter.second_level = 3.0
+        limiter.minute_level = 3.0
+        limiter.updated_at = time.monotonic() - 2.0
+
+        assert await limiter.acquire(wait=False) is True
+        assert limiter.second_level == pytest.approx(1.0)
+        assert limiter.minute_level == pytest.approx(3.0 - 2.0 * 10.0 / 60.0 + 1.0, abs=0.01)
+
+    @pytest.mark.asyncio
+    async def test_waits_for_window_instead_of_failing(self, strict_config):
+        limiter = RateLimiter(strict_config)
+        limiter.second_level = 3.0
+        limiter.minute_level = 3.0
+        limiter.updated_at = time.monotonic() - 0.3
+
+        assert await limiter.acquire(wait=True) is True
+        assert not limiter._lock.locked()
+        assert limiter.second_level == pytest.approx(3.0, abs=0.05)
+
+    @pytest.mark.asyncio
+    async def test_cancel_while_waiting_releases_lock(self, strict_config):
+        limiter = RateLimiter(strict_config)
+        limiter.second_level = 3.0
+        limiter.minute_level = 3.0
+
+        task = asyncio.create_task(limiter.acquire(wait=True))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert not limiter._lock.locked()
+        assert await limiter.acquire(wait=False) is False